@@ -1,869 +1,690 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import random
-import base64
+import json
+import uuid
+from catalog import DATASET_PATHS, DATASETS, dataset_key, task_datasets
+from clusters import LABEL_COLUMN
+from export import EXPORT_FORMATS, export_buffer
+from filters import matching_rows
+from generators import entire_dataset
+from instrumentation import (DEBUG, counters, metrics_text, run_records, stage, start_profile, start_run, stop_profile,
+                             write_metrics)
+from manifest import dumps_manifest, generate_dataset, make_manifest
+from metadata import dataset_info, index_overview
+from preview import PAGE_SIZES, get_order, page_count, preview_page
+from profiling import get_overview, percentiles, histogram
+from regression import NONLINEARITIES, adjust_model, get_regression_model, ground_truth, target_function
+from sampling import new_seed
+from stratify import get_class_index
+from timeseries import TIME_LAYOUTS, arrival_rates, load_time_model
+from trimmer import peek_columns
     
 st.set_page_config(
     page_title="Data Weaver",
     page_icon="📂",
     layout="wide"
 )
-page=st.sidebar.radio("**Select a Page**", ["Home Page", "Automatic Dataset Generator", "Custom Dataset Generator", "Dataset for Classification (ML)", "Dataset for Regression (ML)", "Dataset for Clustering (ML)", "Dataset for Association (ML)", "Dataset Trimmer", "About"])
-
-st.title("Data Weaver: Automatic Dataset Generation and Refinement")
-st.write("This app allows you to generate datasets for various purposes.")  
-
-autods_url = "https://autods-fm7ruhefvjuy5mn46x3yqy.streamlit.app/" 
-if st.button("Apply Data Science techniques"):
-    st.write(f'<a href="{autods_url}" target="_blank">Click here to explore the powerful Data Science tool</a>', unsafe_allow_html=True)
-
-aihub_url = "https://sites.google.com/view/aihub-1?usp=sharing"
-if st.button("Return to AI Hub"):
-    st.write(f'<a href="{aihub_url}" target="_blank">Click here to move back to AI Hub</a>', unsafe_allow_html=True)
-
-# Page 1: Introduction
-if page == "Home Page":
-    # Page 2 Description
-    st.header("Automatic Dataset Generator Page")
-    st.write("This page enables you to generate datasets based on your original dataset. You can select fields from "
-             "your dataset, specify the number of rows (up to 500), and generate a dataset with randomly sampled values. "
-             "You can also download the generated dataset.")
-    
-    # Page 3 Description
-    st.header("Custom Dataset Generator Page")
-    st.write("On this page, you can customize your dataset by specifying the number of fields, field names, and values. "
-             "You can generate a dataset with a maximum of 10 fields and 50 rows. After generating the dataset, "
-             "you can download it.")
-
-    # Page 4 Description
-    st.header("Dataset for Classification (ML) Page")
-    st.write("This page enables you to generate datasets used for Classification (ML) tasks. "
-             "Here, you can select the type of output (binary class or multi-class) and choose a specific dataset for download.")
-
-    # Page 5 Description
-    st.header("Dataset for Regression (ML) Page")
-    st.write("This page enables you to generate datasets used for Regression (ML) tasks. "
-             "Here, you can choose a specific regression dataset for download.")
-
-    # Page 6 Description
-    st.header("Dataset for Clustering (ML) Page")
-    st.write("This page enables you to generate datasets used for Clustering (ML) tasks. "
-             "At each dataset, you can find the column in name 'Cluster' as the last column. "
-             "Here, you can choose a specific clustered dataset for download.")
-    
-    # Page 7 Description
-    st.header("Dataset for Association (ML) Page")
-    st.write("This page enables you to generate datasets used for Association (ML) tasks. "
-             "Each dataset used here as different kind of association rules. "
-             "Here, you can choose a specific association dataset for download.")
-
-    # Page 8 Description
-    st.header("Dataset Trimmer Page")
-    st.write("This page enables you to upload your own dataset. "
-             "Each dataset uploded here is enabled for modification of it's shape. "
-             "At last, you can download your modified dataset.")
-    
-    # Tips
-    st.header("Additional Tips")
-    st.markdown("""
-    1. **Interactive User Interface**: The app is designed to be user-friendly with interactive elements like buttons, select boxes, and data display. Follow the prompts to create and download your datasets effortlessly.
-    """)
-    
-    st.markdown("""
-    2. **Data Validation**: Ensure that you enter valid data types for field names and values. The app provides feedback on data validation to assist you in the process.
-    """)
-    
-    st.markdown("""
-    3. **Error Handling**: In case of errors or issues, the app is equipped with error-handling mechanisms to guide you through a smooth experience.
-    """)
-    
-    st.markdown("""
-    4. **Dataset Preview**: After generating a dataset, it will be displayed for your review. You can explore the data to make sure it meets your requirements.
-    """)
-    
-    st.markdown("""
-    5. **Download in CSV Format**: When you're satisfied with the generated dataset, click the 'Download Dataset' button to download it in CSV format using base64 encoding.
-    """)
-
-    st.write("To get started, use the sidebar navigation to access the respective pages.")
-  
-# Page 2: Automatic Dataset Generator
-elif page == "Automatic Dataset Generator":
-    st.title("Automatic Dataset Generator Page")
-    
-    # Load your original dataset
-    original_dataset = pd.read_csv("data.csv")  
-    
-    # Input fields
-    st.write("Select the fields you want to include in the generated dataset:")
-    selected_fields = st.multiselect("Select field names", original_dataset.columns)
-    
-    # Input number of rows (max 500)
-    num_rows = st.number_input("Enter the number of rows (max 500)", min_value=1, max_value=500)
-    
-    # Generate the dataset
-    if st.button("Generate Automatic Dataset"):
-        if not selected_fields:
-            st.warning("Please select at least one field.")
-        else:
-            # Randomly sample rows from the original dataset
-            generated_df = original_dataset[selected_fields].sample(n=num_rows, replace=True)
-            st.subheader("Generated Dataset:")
-            st.dataframe(generated_df)
-    
-            # Download the dataset using st.button and base64
-            csv = generated_df.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-            
-            st.header("Dataset Overview")
-            
-            # Dataset Shape
-            st.subheader("Dataset Shape:")
-            st.write(generated_df.shape)
-    
-            # Column Names
-            st.subheader("Column Names:")
-            st.write(generated_df.columns)
-    
-            # Data Types
-            st.subheader("Data Types:")
-            st.write(generated_df.dtypes)
-    
-            # Summary Statistics
-            st.subheader("Summary Statistics:")
-            st.write(generated_df.describe())
-
-# Page 3: Manual Dataset Generator
-elif page == "Custom Dataset Generator":
-    st.title("Custom Dataset Generator Page")
-
-    # Input number of fields (max 10)
-    num_fields = st.number_input("Enter the number of fields (max 10)", min_value=1, max_value=10)
-
-    st.markdown(
-        "**Please note the following:**"
-    )
-    st.markdown(
-        "1. The field name can be changed by yourself from default field name."
-    )
-    st.markdown(
-        "2. The field name entered must be of character data type."
-    )
-    
-    # Initialize an empty list to store field names
-    field_names = []
-
-    # Collect field names one by one with unique keys and validate data type
-    for i in range(num_fields):
-        default_field_name = f"Field Name {i + 1}"
-        field_name = st.text_input(f"Enter Field Name {i + 1}", key=f"field_name_{i}", value=default_field_name)
-        if not isinstance(field_name, str):
-            st.error("Field names must be of string data type. Please enter a valid field name.")
-            break
-        field_names.append(field_name)
-
-    st.write("**Field Names**")
-    st.write(field_names)
-    
-    # Input the number of rows
-    num_rows = st.number_input("Enter the number of rows", min_value=1, max_value=500)
-
-    # Collect field values for each row with unique keys
-    field_values = {field_name: [] for field_name in field_names}
-    for i in range(num_rows):
-        st.write(f"Record {i + 1}")
-        for field_name in field_names:
-            field_value = st.text_input(f"Enter the value for {field_name} in Record {i + 1}", key=f"value_{i}_{field_name}")
-            field_values[field_name].append(field_value)
-
-    # Generate the dataset
-    if st.button("Generate Dataset"):
-        data = {field_name: field_values[field_name] for field_name in field_names}
-        generated_df = pd.DataFrame(data)
-        st.subheader("Generated Dataset:")
-        st.dataframe(generated_df)
-
-        # Download the dataset using st.button and base64
-        csv = generated_df.to_csv(index=False)
-        b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-        href = f'data:file/csv;base64,{b64}'
-        st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-        
+
+# Stage timings of this run are collected for the debug panel, opened with ?debug=1 or DATAGEN_DEBUG=1
+start_run()
+debug = DEBUG or st.query_params.get("debug") == "1"
+
+def download_dataset(df, file_name="generated_dataset"):
+    # The callable runs only on click, so no encoded copy is kept in the page
+    fmt = export_format
+    spec = EXPORT_FORMATS[fmt]
+    st.download_button(f"Download Generated Dataset ({spec['label']})", data=lambda: export_buffer(df, fmt),
+                       file_name=file_name + spec["extension"], mime=spec["mime"], on_click="ignore")
+
+def show_overview(df, key=None, entire_shape=None, head_tail=False, overview=None):
+    # Statistics are cached per key (or come from the dataset index), the heavier sections are only computed on request
+    if overview is None:
+        overview = get_overview(df, key)
+    with stage("render", rows=len(df)):
         st.header("Dataset Overview")
-        
+
         # Dataset Shape
-        st.subheader("Dataset Shape:")
-        st.write(generated_df.shape)
+        if entire_shape is not None:
+            st.subheader("Entire Dataset Shape:")
+            st.write(entire_shape)
+            st.subheader("Generated Dataset Shape:")
+        else:
+            st.subheader("Dataset Shape:")
+        st.write(overview["shape"])
 
         # Column Names
         st.subheader("Column Names:")
-        st.write(generated_df.columns)
+        st.write(overview["columns"])
 
         # Data Types
         st.subheader("Data Types:")
-        st.write(generated_df.dtypes)
+        st.write(overview["dtypes"])
 
         # Summary Statistics
         st.subheader("Summary Statistics:")
-        st.write(generated_df.describe())
-
-# Page 4: Dataset for Classification (ML)
-elif page == "Dataset for Classification (ML)":
-    st.title("Dataset for Classification (ML) Page")
-
-    # Select type of output (binary class or multi-class)
-    output_type = st.radio("Select the type of output:", ("Binary Class", "Multi-Class"))
-
-    if output_type == "Binary Class":
-        # Select binary classification dataset
-        selected_dataset = st.selectbox("Select a binary classification dataset:", ("Heart Disease Dataset", "Diabetes Dataset"))
-
-        # Define dataset paths (replace with actual dataset paths)
-        dataset_paths = {
-            "Heart Disease Dataset": "Datasets for ML/Classification/heart_disease_data.csv",
-            "Diabetes Dataset": "Datasets for ML/Classification/diabetes_data.csv",
-        }
-
-        option = st.radio("Select dataset generation option:", ("Entire Dataset", "Random Number of Rows with selected Fields"))
-        
-        if option == "Entire Dataset":
-            # Display the entire dataset
-            if st.button("Generate Dataset"):
-                dataset_url = dataset_paths[selected_dataset]
-        
-                # Load and display the selected dataset
-                dataset = pd.read_csv(dataset_url)
-                
-                st.subheader("Generated Dataset:")
-                st.dataframe(dataset)
-    
-                # Download the dataset using base64 encoding
-                csv =dataset.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-    
-                st.header("Dataset Overview")
-                
-                # Dataset Shape
-                st.subheader("Dataset Shape:")
-                st.write(dataset.shape)
-        
-                # Column Names
-                st.subheader("Column Names:")
-                st.write(dataset.columns)
-        
-                # Data Types
-                st.subheader("Data Types:")
-                st.write(dataset.dtypes)
-        
-                # Summary Statistics
-                st.subheader("Summary Statistics:")
-                st.write(dataset.describe())
-                
-                # Data Head
-                st.subheader("Data Head:")
-                st.write(dataset.head())
-        
-                # Data Tail
-                st.subheader("Data Tail:")
-                st.write(dataset.tail())
-            
-        else:
-            dataset_url = dataset_paths[selected_dataset]
-    
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
-        
-            st.write("Select the fields you want to include in the generated dataset:")
-            selected_fields = st.multiselect("Select field names", dataset.columns)
-            
-            # Generate random number of rows up to 500
-            num_rows = st.number_input("Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-            random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
-    
-            if st.button("Generate Dataset"):
-                if not selected_fields:
-                    st.warning("Please select at least one field.")
-                else:
-                    st.subheader("Generated Dataset:")
-                    st.dataframe(random_rows)
-            
-                    # Download the dataset using base64 encoding
-                    csv =random_rows.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                    href = f'data:file/csv;base64,{b64}'
-                    st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-            
-                    st.header("Dataset Overview")
-                        
-                    # Dataset Shape
-                    st.subheader("Entire Dataset Shape:")
-                    st.write(dataset.shape)
-                    
-                    st.subheader("Generated Dataset Shape:")
-                    st.write(random_rows.shape)
-            
-                    # Column Names
-                    st.subheader("Column Names:")
-                    st.write(random_rows.columns)
-            
-                    # Data Types
-                    st.subheader("Data Types:")
-                    st.write(random_rows.dtypes)
-            
-                    # Summary Statistics
-                    st.subheader("Summary Statistics:")
-                    st.write(random_rows.describe())
-                    
-                    # Data Head
-                    st.subheader("Data Head:")
-                    st.write(random_rows.head())
-            
-                    # Data Tail
-                    st.subheader("Data Tail:")
-                    st.write(random_rows.tail())
-    
-    elif output_type == "Multi-Class":
-        # Select multi-class classification dataset
-        selected_dataset = st.selectbox("Select a multi-class classification dataset:", ("Iris Dataset", "Acoustic Features Dataset"))
-
-        # Define dataset paths (replace with actual dataset paths)
-        dataset_paths = {
-            "Iris Dataset": "Datasets for ML/Classification/iris_data.csv",
-            "Acoustic Features Dataset": "Datasets for ML/Classification/acoustic_features_data.csv",
-        }
-
-        option = st.radio("Select dataset generation option:", ("Entire Dataset", "Random Number of Rows with selected Fields"))
-        
-        if option == "Entire Dataset":
-            # Display the entire dataset
-            if st.button("Generate Dataset"):
-                dataset_url = dataset_paths[selected_dataset]
-        
-                # Load and display the selected dataset
-                dataset = pd.read_csv(dataset_url)
-                
-                st.subheader("Generated Dataset:")
-                st.dataframe(dataset)
-    
-                # Download the dataset using base64 encoding
-                csv =dataset.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-    
-                st.header("Dataset Overview")
-                
-                # Dataset Shape
-                st.subheader("Dataset Shape:")
-                st.write(dataset.shape)
-        
-                # Column Names
-                st.subheader("Column Names:")
-                st.write(dataset.columns)
-        
-                # Data Types
-                st.subheader("Data Types:")
-                st.write(dataset.dtypes)
-        
-                # Summary Statistics
-                st.subheader("Summary Statistics:")
-                st.write(dataset.describe())
-                
-                # Data Head
-                st.subheader("Data Head:")
-                st.write(dataset.head())
-        
-                # Data Tail
-                st.subheader("Data Tail:")
-                st.write(dataset.tail())
-            
-        else:
-            dataset_url = dataset_paths[selected_dataset]
-    
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
-        
-            st.write("Select the fields you want to include in the generated dataset:")
-            selected_fields = st.multiselect("Select field names", dataset.columns)
-            
-            # Generate random number of rows up to 500
-            num_rows = st.number_input("Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-            random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
-    
-            if st.button("Generate Dataset"):
-                if not selected_fields:
-                    st.warning("Please select at least one field.")
-                else:
-                    st.subheader("Generated Dataset:")
-                    st.dataframe(random_rows)
-            
-                    # Download the dataset using base64 encoding
-                    csv =random_rows.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                    href = f'data:file/csv;base64,{b64}'
-                    st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-            
-                    st.header("Dataset Overview")
-                        
-                    # Dataset Shape
-                    st.subheader("Entire Dataset Shape:")
-                    st.write(dataset.shape)
-                    
-                    st.subheader("Generated Dataset Shape:")
-                    st.write(random_rows.shape)
-            
-                    # Column Names
-                    st.subheader("Column Names:")
-                    st.write(random_rows.columns)
-            
-                    # Data Types
-                    st.subheader("Data Types:")
-                    st.write(random_rows.dtypes)
-            
-                    # Summary Statistics
-                    st.subheader("Summary Statistics:")
-                    st.write(random_rows.describe())
-                    
-                    # Data Head
-                    st.subheader("Data Head:")
-                    st.write(random_rows.head())
-            
-                    # Data Tail
-                    st.subheader("Data Tail:")
-                    st.write(random_rows.tail())
-
-# Page 5: Dataset for Regression (ML)
-elif page == "Dataset for Regression (ML)":
-    st.title("Dataset for Regression (ML) Page")
-
-    # Select regression dataset
-    selected_dataset = st.selectbox("Select a regression dataset:", ("Car Price Dataset", "Electricity Dataset", "House Price Dataset"))
-
-    dataset_paths = {
-            "Car Price Dataset": "Datasets for ML/Regression/car_price_data.csv",
-            "Electricity Dataset": "Datasets for ML/Regression/electricity_data.csv",
-            "House Price Dataset": "Datasets for ML/Regression/house_price_data.csv", 
-        }
-
-    option = st.radio("Select dataset generation option:", ("Entire Dataset", "Random Number of Rows with selected Fields"))
-        
-    if option == "Entire Dataset":
-        # Display the entire dataset
-        if st.button("Generate Dataset"):
-            dataset_url = dataset_paths[selected_dataset]
-    
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
-            
-            st.subheader("Generated Dataset:")
-            st.dataframe(dataset)
-
-            # Download the dataset using base64 encoding
-            csv =dataset.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-
-            st.header("Dataset Overview")
-            
-            # Dataset Shape
-            st.subheader("Dataset Shape:")
-            st.write(dataset.shape)
-    
-            # Column Names
-            st.subheader("Column Names:")
-            st.write(dataset.columns)
-    
-            # Data Types
-            st.subheader("Data Types:")
-            st.write(dataset.dtypes)
-    
-            # Summary Statistics
-            st.subheader("Summary Statistics:")
-            st.write(dataset.describe())
-            
-            # Data Head
-            st.subheader("Data Head:")
-            st.write(dataset.head())
-    
-            # Data Tail
-            st.subheader("Data Tail:")
-            st.write(dataset.tail())
-        
-    else:
-        dataset_url = dataset_paths[selected_dataset]
+        if overview["summary"] is not None:
+            st.write(overview["summary"])
+        if overview["categorical_summary"] is not None:
+            st.write(overview["categorical_summary"])
 
-        # Load and display the selected dataset
-        dataset = pd.read_csv(dataset_url)
-    
-        st.write("Select the fields you want to include in the generated dataset:")
-        selected_fields = st.multiselect("Select field names", dataset.columns)
-        
-        # Generate random number of rows up to 500
-        num_rows = st.number_input("Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-        random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
-
-        if st.button("Generate Dataset"):
-            if not selected_fields:
-                st.warning("Please select at least one field.")
-            else:
-                st.subheader("Generated Dataset:")
-                st.dataframe(random_rows)
-        
-                # Download the dataset using base64 encoding
-                csv =random_rows.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-        
-                st.header("Dataset Overview")
-                    
-                # Dataset Shape
-                st.subheader("Entire Dataset Shape:")
-                st.write(dataset.shape)
-                
-                st.subheader("Generated Dataset Shape:")
-                st.write(random_rows.shape)
-        
-                # Column Names
-                st.subheader("Column Names:")
-                st.write(random_rows.columns)
-        
-                # Data Types
-                st.subheader("Data Types:")
-                st.write(random_rows.dtypes)
-        
-                # Summary Statistics
-                st.subheader("Summary Statistics:")
-                st.write(random_rows.describe())
-                
-                # Data Head
-                st.subheader("Data Head:")
-                st.write(random_rows.head())
-        
-                # Data Tail
-                st.subheader("Data Tail:")
-                st.write(random_rows.tail())
-
-# Page 6: Dataset for Clustering (ML)
-elif page == "Dataset for Clustering (ML)":
-    st.title("Dataset for Clustering (ML) Page")
-
-    # Select clustering dataset
-    selected_dataset = st.selectbox("Select a clustered dataset:", ("Sample Dataset 1", "Sample Dataset 2", "Sample Dataset 3"))
-
-    dataset_paths = {
-            "Sample Dataset 1": "Datasets for ML/Clustering/clustered_data_1.csv",
-            "Sample Dataset 2": "Datasets for ML/Clustering/clustered_data_2.csv",
-            "Sample Dataset 3": "Datasets for ML/Clustering/clustered_data_3.csv", 
-        }
-
-    option = st.radio("Select dataset generation option:", ("Entire Dataset", "Random Number of Rows with selected Fields"))
-        
-    if option == "Entire Dataset":
-        # Display the entire dataset
-        if st.button("Generate Dataset"):
-            dataset_url = dataset_paths[selected_dataset]
-    
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
-            
-            st.subheader("Generated Dataset:")
-            st.dataframe(dataset)
-
-            # Download the dataset using base64 encoding
-            csv =dataset.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-
-            st.header("Dataset Overview")
-            
-            # Dataset Shape
-            st.subheader("Dataset Shape:")
-            st.write(dataset.shape)
-    
-            # Column Names
-            st.subheader("Column Names:")
-            st.write(dataset.columns)
-    
-            # Data Types
-            st.subheader("Data Types:")
-            st.write(dataset.dtypes)
-    
-            # Summary Statistics
-            st.subheader("Summary Statistics:")
-            st.write(dataset.describe())
-            
+        if head_tail:
             # Data Head
             st.subheader("Data Head:")
-            st.write(dataset.head())
-    
-            # Data Tail
-            st.subheader("Data Tail:")
-            st.write(dataset.tail())
-        
-    else:
-        dataset_url = dataset_paths[selected_dataset]
+            st.write(overview["head"])
 
-        # Load and display the selected dataset
-        dataset = pd.read_csv(dataset_url)
-    
-        st.write("Select the fields you want to include in the generated dataset:")
-        selected_fields = st.multiselect("Select field names", dataset.columns)
-        
-        # Make the last field compulsory
-        last_field = dataset.columns[-1]
-        
-        if last_field not in selected_fields:
-            selected_fields.append(last_field)
-        
-        # Generate random number of rows up to 500
-        num_rows = st.number_input("Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-        random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
-
-        if st.button("Generate Dataset"):
-            if not selected_fields:
-                st.warning("Please select at least one field.")
-            else:
-                st.subheader("Generated Dataset:")
-                st.dataframe(random_rows)
-        
-                # Download the dataset using base64 encoding
-                csv =random_rows.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-        
-                st.header("Dataset Overview")
-                    
-                # Dataset Shape
-                st.subheader("Entire Dataset Shape:")
-                st.write(dataset.shape)
-                
-                st.subheader("Generated Dataset Shape:")
-                st.write(random_rows.shape)
-        
-                # Column Names
-                st.subheader("Column Names:")
-                st.write(random_rows.columns)
-        
-                # Data Types
-                st.subheader("Data Types:")
-                st.write(random_rows.dtypes)
-        
-                # Summary Statistics
-                st.subheader("Summary Statistics:")
-                st.write(random_rows.describe())
-                
-                # Data Head
-                st.subheader("Data Head:")
-                st.write(random_rows.head())
-        
-                # Data Tail
-                st.subheader("Data Tail:")
-                st.write(random_rows.tail())
-
-# Page 7: Dataset for Association (ML)
-elif page == "Dataset for Association (ML)":
-    st.title("Dataset for Association (ML) Page")
-
-    # Select association dataset
-    selected_dataset = st.selectbox("Select a association dataset:", ("Bakery Dataset", "Basket Analysis Dataset", "Groceries Dataset"))
-
-    dataset_paths = {
-            "Bakery Dataset": "Datasets for ML/Association/bakery_data.csv",
-            "Basket Analysis Dataset": "Datasets for ML/Association/basket_analysis_data.csv",
-            "Groceries Dataset": "Datasets for ML/Association/groceries_data.csv", 
-        }
-
-    option = st.radio("Select dataset generation option:", ("Entire Dataset", "Random Number of Rows with selected Fields"))
-        
-    if option == "Entire Dataset":
-        # Display the entire dataset
-        if st.button("Generate Dataset"):
-            dataset_url = dataset_paths[selected_dataset]
-    
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
-            
-            st.subheader("Generated Dataset:")
-            st.dataframe(dataset)
-
-            # Download the dataset using base64 encoding
-            csv =dataset.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-
-            st.header("Dataset Overview")
-            
-            # Dataset Shape
-            st.subheader("Dataset Shape:")
-            st.write(dataset.shape)
-    
-            # Column Names
-            st.subheader("Column Names:")
-            st.write(dataset.columns)
-    
-            # Data Types
-            st.subheader("Data Types:")
-            st.write(dataset.dtypes)
-    
-            # Summary Statistics
-            st.subheader("Summary Statistics:")
-            st.write(dataset.describe())
-            
-            # Data Head
-            st.subheader("Data Head:")
-            st.write(dataset.head())
-    
             # Data Tail
             st.subheader("Data Tail:")
-            st.write(dataset.tail())
-        
+            st.write(overview["tail"])
+
+        if overview["numeric_columns"]:
+            show_overview_details(overview)
+
+def generate_on_click(generator, params, label="Generate Dataset", warning=None, error_message=None, files=None):
+    # The result is kept in the session per page, so reruns caused by other widgets
+    # show the same rows until the button is clicked again with the same inputs
+    fixed_seed = st.number_input("Random seed (0 draws a new one on each click):", min_value=0, value=0, key=f"seed_{page}")
+    uploads = tuple(getattr(fileobj, "file_id", None) for fileobj in (files or {}).values())
+    inputs = (page, fixed_seed, generator, params, uploads)
+    results = st.session_state.setdefault("results", {})
+    if st.button(label):
+        results.pop(page, None)
+        if warning:
+            st.warning(warning)
+        else:
+            seed = fixed_seed or new_seed()
+            try:
+                # Generated through the replay manifest machinery, so the manifest rebuilds exactly these rows
+                data = generate_dataset(generator, params, seed, files)
+                manifest = make_manifest(generator, params, seed, files)
+                results[page] = {"inputs": inputs, "seed": seed, "data": data, "manifest": manifest}
+            except ValueError as error:
+                st.error(error_message or str(error))
+    result = results.get(page)
+    if result is not None and result["inputs"] == inputs:
+        return result
+    return None
+
+def filter_input():
+    # Optional pandas query the rows are filtered with before sampling
+    where = st.text_input("Filter rows (optional), e.g. ocean_proximity == 'NEAR BAY' and median_income > 5:",
+                          key=f"where_{page}").strip()
+    return where or None
+
+def show_dataset(df, key, entire_shape=None, head_tail=False, seed=None, manifest=None, overview=None):
+    # Last stage of every page: preview, download and overview, the overview is cached by key
+    st.subheader("Generated Dataset:")
+    if seed is not None:
+        st.write(f"Random seed: {seed}")
+    show_preview(df, key)
+
+    # Download the dataset, the CSV is only encoded when the button is clicked
+    download_dataset(df)
+    if manifest is not None:
+        st.download_button("Download Replay Manifest", data=dumps_manifest(manifest),
+                           file_name="generated_dataset.manifest.json", mime="application/json", on_click="ignore")
+
+    show_overview(df, key=key, entire_shape=entire_shape, head_tail=head_tail, overview=overview)
+
+def show_result(result, entire_shape=None, head_tail=False):
+    # Results are keyed by their inputs and seed, so reruns reuse the cached preview order and overview
+    show_dataset(result["data"], ("result", repr(result["inputs"]), result["seed"]), entire_shape, head_tail,
+                 result["seed"], result["manifest"])
+
+@st.fragment
+def show_preview(df, key=None):
+    # Runs as a fragment so paging does not rerun the page, and only the visible rows are sent to the browser
+    columns = list(df.columns)
+    widget_key = f"preview_{abs(hash(tuple(columns)))}"
+    sort_column, filter_column, page_column = st.columns(3)
+    sort_by = sort_column.selectbox("Sort by", [None] + columns, key=f"{widget_key}_sort",
+                                    format_func=lambda column: "(original order)" if column is None else column)
+    ascending = sort_column.toggle("Ascending", value=True, key=f"{widget_key}_ascending")
+    filter_by = filter_column.selectbox("Filter column", columns, key=f"{widget_key}_filter_by")
+    filter_text = filter_column.text_input("Contains", key=f"{widget_key}_filter_text")
+    page_size = page_column.selectbox("Rows per page", PAGE_SIZES, key=f"{widget_key}_page_size")
+
+    positions = get_order(df, key, sort_by, ascending, filter_by, filter_text.strip())
+    pages = page_count(len(positions), page_size)
+    if st.session_state.get(f"{widget_key}_page", 1) > pages:
+        st.session_state[f"{widget_key}_page"] = 1
+    page_number = page_column.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{widget_key}_page")
+
+    with stage("render", rows=page_size):
+        st.dataframe(preview_page(df, positions, page_number, page_size))
+    start = (page_number - 1) * page_size
+    st.caption(f"Rows {min(start + 1, len(positions))}-{min(start + page_size, len(positions))} of "
+               f"{len(positions)} matching rows ({len(df)} in total)")
+
+def show_debug_panel():
+    # Timings of the stages of this run and of the whole server process, and optional cProfile dumps
+    with st.expander("Debug: stage timings"):
+        records = run_records()
+        st.write("Stages of this run:")
+        if records:
+            table = pd.DataFrame(records)
+            st.dataframe(table[["stage", "seconds", "memory_growth_bytes"] + [column for column in table.columns
+                                if column not in ("stage", "seconds", "memory_growth_bytes")]])
+        else:
+            st.write("No stage ran.")
+        st.write("Since the server started:")
+        st.dataframe(pd.DataFrame(counters()).T)
+        st.code(metrics_text(), language="text")
+        st.toggle("Record a cProfile dump of every run of this session", key="debug_profile")
+        profile_path = st.session_state.get("debug_profile_path")
+        if profile_path:
+            st.write(f"Last dump: {profile_path}")
+            with open(profile_path, "rb") as fileobj:
+                st.download_button("Download cProfile Dump", data=fileobj.read(), file_name="run.prof",
+                                   mime="application/octet-stream", on_click="ignore")
+
+@st.fragment
+def show_overview_details(overview):
+    # Runs as a fragment so toggling it does not rerun (and lose) the generated page
+    if st.toggle("Show percentiles and histograms"):
+        st.subheader("Percentiles:")
+        st.write(percentiles(overview))
+        column = st.selectbox("Histogram of column:", overview["numeric_columns"])
+        st.bar_chart(histogram(overview, column))
+
+RULE_LABELS = {
+    "Sequence": "sequence",
+    "Choice List": "choice",
+    "Numeric Range": "range",
+    "Pattern": "pattern",
+    "Template": "template",
+}
+
+def field_rule_input(field_name, i):
+    # A few widgets per field, whatever the number of rows
+    with st.expander(f"Rule for {field_name}", expanded=True):
+        rule = RULE_LABELS[st.selectbox("Rule", list(RULE_LABELS), key=f"rule_{i}")]
+        field = {"name": field_name, "rule": rule}
+        if rule == "sequence":
+            field["start"] = st.number_input("Start", value=1, key=f"start_{i}")
+            field["step"] = st.number_input("Step", value=1, key=f"step_{i}")
+        elif rule == "choice":
+            values = st.text_input("Values (comma separated)", value="A,B,C", key=f"values_{i}")
+            weights = st.text_input("Weights (comma separated, optional)", key=f"weights_{i}")
+            field["values"] = [value.strip() for value in values.split(",")]
+            try:
+                field["weights"] = [float(weight) for weight in weights.split(",")] if weights.strip() else None
+            except ValueError:
+                st.error("Weights must be numbers.")
+                field["weights"] = None
+        elif rule == "range":
+            field["low"] = st.number_input("Minimum", value=0.0, key=f"low_{i}")
+            field["high"] = st.number_input("Maximum", value=100.0, key=f"high_{i}")
+            field["integer"] = st.checkbox("Whole numbers only", value=True, key=f"integer_{i}")
+        elif rule == "pattern":
+            field["pattern"] = st.text_input("Pattern, e.g. [A-Z]{3}-\\d{4}", value="[A-Z]{3}\\d{4}", key=f"pattern_{i}")
+        else:
+            field["template"] = st.text_input("Template, e.g. user_{row}", value="value_{row}", key=f"template_{i}")
+    return field
+
+def stratified_rows(name):
+    # Rows are drawn per class from a cached class index, so the class counts are exact
+    dataset_url = DATASET_PATHS[name]
+    index = get_class_index(dataset_url)
+    label = index["label"]
+    columns = [column for column in dataset_info(name)["columns"] if column != label]
+
+    st.write(f"Rows are sampled per class of the '{label}' field, which is always included.")
+    st.write("Select the fields you want to include in the generated dataset:")
+    selected_fields = st.multiselect("Select field names", columns)
+
+    num_rows = st.number_input("Select the number of rows (1-100000):", min_value=1, max_value=100000, value=1000)
+    proportions = st.radio("Select the class proportions:", ("Original Proportions", "Balanced Classes", "Custom Weights"))
+    if proportions == "Original Proportions":
+        proportions = "original"
+    elif proportions == "Balanced Classes":
+        proportions = "balanced"
     else:
-        dataset_url = dataset_paths[selected_dataset]
+        proportions = {str(value): st.number_input(f"Weight of class {value}", min_value=0.0, value=1.0, key=f"weight_{value}")
+                       for value in index["classes"]}
+    smote = st.checkbox("Interpolate new rows for classes with fewer rows than requested (SMOTE), instead of repeating rows")
+
+    params = {"source": dataset_url, "fields": selected_fields, "num_rows": num_rows, "proportions": proportions, "smote": smote}
+    result = generate_on_click("stratified", params,
+                               warning=None if selected_fields else "Please select at least one field.")
+    if result is not None:
+        show_result(result, entire_shape=entire_shape(name), head_tail=True)
+
+def entire_shape(name):
+    # Shape of a bundled dataset, read from the dataset index
+    info = dataset_info(name)
+    return info["rows"], len(info["columns"])
+
+def entire_rows(name):
+    # Display the entire dataset, its overview statistics come from the dataset index
+    if st.button("Generate Dataset"):
+        dataset_url = DATASET_PATHS[name]
+        df = entire_dataset(dataset_url)
+        show_dataset(df, dataset_key(dataset_url), head_tail=True, overview=index_overview(dataset_info(name), df))
 
-        # Load and display the selected dataset
-        dataset = pd.read_csv(dataset_url)
-    
-        st.write("Select the fields you want to include in the generated dataset:")
-        selected_fields = st.multiselect("Select field names", dataset.columns)
-        
-        # Generate random number of rows up to 500
-        num_rows = st.number_input("Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-        random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
-
-        if st.button("Generate Dataset"):
-            if not selected_fields:
-                st.warning("Please select at least one field.")
-            else:
-                st.subheader("Generated Dataset:")
-                st.dataframe(random_rows)
-        
-                # Download the dataset using base64 encoding
-                csv =random_rows.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-        
-                st.header("Dataset Overview")
-                    
-                # Dataset Shape
-                st.subheader("Entire Dataset Shape:")
-                st.write(dataset.shape)
-                
-                st.subheader("Generated Dataset Shape:")
-                st.write(random_rows.shape)
-        
-                # Column Names
-                st.subheader("Column Names:")
-                st.write(random_rows.columns)
-        
-                # Data Types
-                st.subheader("Data Types:")
-                st.write(random_rows.dtypes)
-        
-                # Summary Statistics
-                st.subheader("Summary Statistics:")
-                st.write(random_rows.describe())
-                
-                # Data Head
-                st.subheader("Data Head:")
-                st.write(random_rows.head())
-        
-                # Data Tail
-                st.subheader("Data Tail:")
-                st.write(random_rows.tail())
-
-# Page 7: Dataset Trimmer
-elif page == "Dataset Trimmer":
-    st.title("Dataset Trimmer Page")
-    
-    # Upload a dataset
-    uploaded_file = st.file_uploader("Upload a Dataset", type=["csv"])
-    
-    # Initialize data as None
-    original_dataset = None
-    
-    # Check if a file was uploaded and if it's valid
-    if uploaded_file is not None:
+def random_rows(name):
+    dataset_url = DATASET_PATHS[name]
+
+    # The column names of the selected dataset come from the dataset index
+    columns = dataset_info(name)["columns"]
+
+    st.write("Select the fields you want to include in the generated dataset:")
+    selected_fields = st.multiselect("Select field names", columns)
+
+    # Mandatory fields of the dataset (e.g. the cluster label) are always included
+    selected_fields += [column for column in DATASETS[name].get("mandatory", []) if column not in selected_fields]
+
+    # Only the rows matching the filter are sampled, its mask is cached so the count below is instant on reruns
+    where = filter_input()
+    if where:
         try:
-            original_dataset = pd.read_csv(uploaded_file)
-        except (ValueError, pd.errors.ParserError):
-            st.error("The uploaded dataset is not in a valid format or language. Please upload a valid dataset in CSV format.")
-            original_dataset = None  # Set data to None if it's not valid
-
-    if original_dataset is not None and not original_dataset.empty:
-        
-        if original_dataset.shape[0] <= 5000 and original_dataset.shape[1] <= 50:
-    
-            # Input fields
-            st.write("Select the fields you want to include in the generated dataset:")
-            selected_fields = st.multiselect("Select field names", original_dataset.columns)
-            
-            # Input number of rows (max 500)
-            num_rows = st.number_input(f"Enter the number of rows (max {original_dataset.shape[0]} rows)", min_value=1, max_value=original_dataset.shape[0])
-            
+            st.write(f"{len(matching_rows(dataset_url, where))} of {entire_shape(name)[0]} rows match the filter.")
+        except ValueError as error:
+            st.error(str(error))
+
+    # Generate random number of rows up to 500
+    num_rows = st.number_input("Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
+
+    # Rows are only sampled on click, then kept for the following reruns
+    params = {"source": dataset_url, "fields": selected_fields, "num_rows": num_rows, "where": where}
+    result = generate_on_click("sample", params, warning=None if selected_fields else "Please select at least one field.")
+    if result is not None:
+        show_result(result, entire_shape=entire_shape(name), head_tail=True)
+
+def regression_rows(name):
+    dataset_url = DATASET_PATHS[name]
+
+    # Features are drawn from their fitted distribution, the target from a known function of them
+    st.write("A linear model is fitted on the selected dataset. Its coefficients, intercept and noise can be "
+             "changed below, and are saved with the generated dataset as its ground truth.")
+    info = dataset_info(name)
+    feature_columns = [column for column in info["numeric_columns"] if column != info["label"]]
+    st.write("Select the feature fields you want to include in the generated dataset:")
+    selected_fields = st.multiselect("Select field names", feature_columns)
+
+    model = None
+    if selected_fields:
+        model = get_regression_model(dataset_url, selected_fields)
+        truth = st.data_editor(ground_truth(model), disabled=["term"], hide_index=True,
+                               key=f"truth_{name}_{'_'.join(selected_fields)}")
+        noise = st.number_input("Noise standard deviation:", min_value=0.0, value=model["noise"])
+        nonlinearity = st.selectbox("Target function of the linear predictor:", list(NONLINEARITIES))
+        model = adjust_model(model, coefficients=truth["coefficient"].iloc[1:].tolist(),
+                             intercept=truth["coefficient"].iloc[0], noise=noise, nonlinearity=nonlinearity)
+        st.write(f"Target function: {target_function(model)}")
+
+    num_rows = st.number_input("Select the number of rows (1-100000):", min_value=1, max_value=100000, value=1000)
+
+    result = generate_on_click("regression", {"source": dataset_url, "model": model, "num_rows": num_rows},
+                               warning=None if selected_fields else "Please select at least one field.")
+    if result is not None:
+        st.download_button("Download Ground Truth", data=json.dumps(dict(model, target_function=target_function(model)), indent=1),
+                           file_name="ground_truth.json", mime="application/json", on_click="ignore")
+        show_result(result, head_tail=True)
+
+def cluster_points(name):
+    dataset_url = DATASET_PATHS[name]
+
+    # The column names of the selected dataset come from the dataset index
+    columns = dataset_info(name)["columns"]
+
+    st.write("New points are drawn around the centroids of the labeled clusters of the selected dataset, "
+             "with the spread of each cluster.")
+    st.write("Select the fields you want to include in the generated dataset:")
+    selected_fields = st.multiselect("Select field names", [column for column in columns if column != LABEL_COLUMN])
+
+    # Generate up to 100000 points, optionally with more clusters placed further apart
+    num_points = st.number_input("Select the number of points (1-100000):", min_value=1, max_value=100000, value=1000)
+    num_clusters = st.number_input("Select the number of clusters (0 keeps the clusters of the dataset):", min_value=0, max_value=100, value=0)
+    separation = st.slider("Select the separation between clusters:", min_value=0.0, max_value=5.0, value=1.0, step=0.1)
+
+    params = {"source": dataset_url, "fields": selected_fields, "num_rows": num_points,
+              "num_clusters": num_clusters, "separation": separation}
+    result = generate_on_click("clusters", params,
+                               warning=None if selected_fields else "Please select at least one field.")
+    if result is not None:
+        show_result(result, head_tail=True)
+
+def basket_rows(name, synthetic):
+    # Transactions keep the items bought together, unlike sampling single rows
+    if synthetic:
+        st.write("New transactions are generated from the item frequencies and co-occurrences of the selected dataset.")
+    else:
+        st.write("Whole transactions of the selected dataset are sampled, so items bought together stay together.")
+    num_transactions = st.number_input("Select the number of transactions (1-100000):", min_value=1, max_value=100000, value=100)
+
+    result = generate_on_click("baskets", {"source": name, "num_rows": num_transactions, "synthetic": synthetic})
+    if result is not None:
+        show_result(result, head_tail=True)
+
+def time_series_rows(name):
+    # Transactions get new timestamps drawn from the arrival rates of the selected dataset, in time order
+    if name not in TIME_LAYOUTS:
+        st.warning("The selected dataset has no timestamps, please select the Bakery or Groceries dataset.")
+        return
+    st.write("Transactions are generated day by day with the arrival rates of the selected dataset per day type and "
+             "daypart, at the times of day it has them, with baskets bought at those times.")
+    start = st.date_input("Select the first day (empty starts the day after the dataset ends):", value=None)
+    num_days = st.number_input("Select the number of days (1-365):", min_value=1, max_value=365, value=30)
+    scale = st.number_input("Multiply the arrival rates by:", min_value=0.1, max_value=100.0, value=1.0)
+
+    params = {"source": name, "num_days": num_days, "start": start.isoformat() if start else None, "scale": scale}
+    result = generate_on_click("timeseries", params)
+    if result is not None:
+        st.subheader("Transactions per Day:")
+        st.dataframe(arrival_rates(load_time_model(name)).mul(scale).round(2))
+        show_result(result, head_tail=True)
+
+# Generation options of the dataset pages by task; every page runs the chosen option on the selected dataset
+TASK_OPTIONS = {
+    "classification": {
+        "Entire Dataset": entire_rows,
+        "Random Number of Rows with selected Fields": random_rows,
+        "Stratified Rows by Class": stratified_rows,
+    },
+    "regression": {
+        "Entire Dataset": entire_rows,
+        "Random Number of Rows with selected Fields": random_rows,
+        "Synthetic Rows with Known Coefficients": regression_rows,
+    },
+    "clustering": {
+        "Entire Dataset": entire_rows,
+        "Random Number of Rows with selected Fields": random_rows,
+        "Synthetic Labeled Points": cluster_points,
+    },
+    "association": {
+        "Entire Dataset": entire_rows,
+        "Random Number of Rows with selected Fields": random_rows,
+        "Random Whole Transactions": lambda name: basket_rows(name, synthetic=False),
+        "Synthetic Transactions": lambda name: basket_rows(name, synthetic=True),
+        "Time-Series Transactions": time_series_rows,
+    },
+}
+
+def dataset_page(task, prompt, group=None):
+    # Select a dataset of the task, then run the selected generation option on it
+    selected_dataset = st.selectbox(prompt, task_datasets(task, group), format_func=lambda name: DATASETS[name]["title"])
+    options = TASK_OPTIONS[task]
+    option = st.radio("Select dataset generation option:", list(options))
+    options[option](selected_dataset)
+
+# A run cut short by a rerun or a stop still ends its profile and writes its metrics
+profiler = start_profile() if st.session_state.get("debug_profile") else None
+try:
+    page=st.sidebar.radio("**Select a Page**", ["Home Page", "Automatic Dataset Generator", "Custom Dataset Generator", "Dataset for Classification (ML)", "Dataset for Regression (ML)", "Dataset for Clustering (ML)", "Dataset for Association (ML)", "Dataset Trimmer", "About"])
+
+    # Format of every download, chosen in the sidebar so changing it keeps the generated dataset on the page
+    export_format = st.sidebar.selectbox("**Download Format**", list(EXPORT_FORMATS), format_func=lambda fmt: EXPORT_FORMATS[fmt]["label"])
+
+    st.title("Data Weaver: Automatic Dataset Generation and Refinement")
+    st.write("This app allows you to generate datasets for various purposes.")  
+
+    autods_url = "https://autods-fm7ruhefvjuy5mn46x3yqy.streamlit.app/" 
+    if st.button("Apply Data Science techniques"):
+        st.write(f'<a href="{autods_url}" target="_blank">Click here to explore the powerful Data Science tool</a>', unsafe_allow_html=True)
+
+    aihub_url = "https://sites.google.com/view/aihub-1?usp=sharing"
+    if st.button("Return to AI Hub"):
+        st.write(f'<a href="{aihub_url}" target="_blank">Click here to move back to AI Hub</a>', unsafe_allow_html=True)
+
+    # Page 1: Introduction
+    if page == "Home Page":
+        # Page 2 Description
+        st.header("Automatic Dataset Generator Page")
+        st.write("This page enables you to generate datasets based on your original dataset. You can select fields from "
+                 "your dataset, specify the number of rows (up to 500), and generate a dataset with randomly sampled values. "
+                 "You can also download the generated dataset.")
+
+        # Page 3 Description
+        st.header("Custom Dataset Generator Page")
+        st.write("On this page, you can customize your dataset by specifying the number of fields, field names, and values. "
+                 "Values can be generated from a rule per field (sequence, choice list, numeric range, pattern or template) "
+                 "or entered manually in a grid. After generating the dataset, you can download it.")
+
+        # Page 4 Description
+        st.header("Dataset for Classification (ML) Page")
+        st.write("This page enables you to generate datasets used for Classification (ML) tasks. "
+                 "Here, you can select the type of output (binary class or multi-class) and choose a specific dataset for download. "
+                 "Rows can also be sampled per class, with the original, balanced or custom class proportions.")
+
+        # Page 5 Description
+        st.header("Dataset for Regression (ML) Page")
+        st.write("This page enables you to generate datasets used for Regression (ML) tasks. "
+                 "Here, you can choose a specific regression dataset for download, "
+                 "or generate new rows from a target function with known coefficients.")
+
+        # Page 6 Description
+        st.header("Dataset for Clustering (ML) Page")
+        st.write("This page enables you to generate datasets used for Clustering (ML) tasks. "
+                 "At each dataset, you can find the column in name 'Cluster' as the last column. "
+                 "Here, you can choose a specific clustered dataset for download, "
+                 "or generate any number of new labeled points around its clusters.")
+
+        # Page 7 Description
+        st.header("Dataset for Association (ML) Page")
+        st.write("This page enables you to generate datasets used for Association (ML) tasks. "
+                 "Each dataset used here as different kind of association rules. "
+                 "Here, you can choose a specific association dataset for download.")
+
+        # Page 8 Description
+        st.header("Dataset Trimmer Page")
+        st.write("This page enables you to upload your own dataset. "
+                 "Each dataset uploded here is enabled for modification of it's shape. "
+                 "At last, you can download your modified dataset.")
+
+        # Tips
+        st.header("Additional Tips")
+        st.markdown("""
+        1. **Interactive User Interface**: The app is designed to be user-friendly with interactive elements like buttons, select boxes, and data display. Follow the prompts to create and download your datasets effortlessly.
+        """)
+
+        st.markdown("""
+        2. **Data Validation**: Ensure that you enter valid data types for field names and values. The app provides feedback on data validation to assist you in the process.
+        """)
+
+        st.markdown("""
+        3. **Error Handling**: In case of errors or issues, the app is equipped with error-handling mechanisms to guide you through a smooth experience.
+        """)
+
+        st.markdown("""
+        4. **Dataset Preview**: After generating a dataset, it will be displayed for your review. You can explore the data to make sure it meets your requirements.
+        """)
+
+        st.markdown("""
+        5. **Download in CSV Format**: When you're satisfied with the generated dataset, click the 'Download Generated Dataset' button to download it in CSV format, or pick compressed CSV, Parquet, Feather or JSON Lines as the download format in the sidebar.
+        """)
+
+        st.write("To get started, use the sidebar navigation to access the respective pages.")
+
+    # Page 2: Automatic Dataset Generator
+    elif page == "Automatic Dataset Generator":
+        st.title("Automatic Dataset Generator Page")
+
+        # Read the column names of your original dataset
+        columns = dataset_info("data")["columns"]
+
+        # Input fields
+        st.write("Select the fields you want to include in the generated dataset:")
+        selected_fields = st.multiselect("Select field names", columns)
+
+        # Select how the rows are generated
+        method = st.radio("Select the generation method:", ("Resample Original Rows", "Synthesize New Rows"))
+        if method == "Synthesize New Rows":
+            st.write("New rows are drawn from distributions fitted on each field, so they are not copies of the original rows.")
+            correlated = st.checkbox("Keep the correlation between fields", value=True)
+            max_rows = 100000
+        else:
+            max_rows = 500
+
+        # Input number of rows
+        num_rows = st.number_input(f"Enter the number of rows (max {max_rows})", min_value=1, max_value=max_rows)
+
+        # Generate the dataset
+        params = {"source": "data.csv", "fields": selected_fields, "num_rows": num_rows}
+        if method == "Synthesize New Rows":
+            # Sample new rows from the model fitted on the original dataset
+            generator = "synthesize"
+            params["correlated"] = correlated
+        else:
+            # Randomly sample rows from the original dataset
+            generator = "sample"
+        result = generate_on_click(generator, params, label="Generate Automatic Dataset",
+                                   warning=None if selected_fields else "Please select at least one field.")
+        if result is not None:
+            show_result(result)
+
+    # Page 3: Manual Dataset Generator
+    elif page == "Custom Dataset Generator":
+        st.title("Custom Dataset Generator Page")
+
+        # Input number of fields (max 10)
+        num_fields = st.number_input("Enter the number of fields (max 10)", min_value=1, max_value=10)
+
+        st.markdown(
+            "**Please note the following:**"
+        )
+        st.markdown(
+            "1. The field name can be changed by yourself from default field name."
+        )
+        st.markdown(
+            "2. The field name entered must be of character data type."
+        )
+
+        # Initialize an empty list to store field names
+        field_names = []
+
+        # Collect field names one by one with unique keys and validate data type
+        for i in range(num_fields):
+            default_field_name = f"Field Name {i + 1}"
+            field_name = st.text_input(f"Enter Field Name {i + 1}", key=f"field_name_{i}", value=default_field_name)
+            if not isinstance(field_name, str):
+                st.error("Field names must be of string data type. Please enter a valid field name.")
+                break
+            field_names.append(field_name)
+
+        st.write("**Field Names**")
+        st.write(field_names)
+
+        # Select how the values are filled in
+        mode = st.radio("Select how the values are filled in:", ("Generate Values from Rules", "Enter Values Manually"))
+
+        # Repeated field names would collapse into one column
+        field_names = list(dict.fromkeys(field_names))
+
+        if mode == "Generate Values from Rules":
+            st.markdown(
+                "Each field gets a rule and all rows are generated at once. "
+                "Templates can use earlier fields as {Field Name} and the row number as {row}."
+            )
+            field_specs = [field_rule_input(field_name, i) for i, field_name in enumerate(field_names)]
+
+            # Input the number of rows
+            num_rows = st.number_input("Enter the number of rows (max 100000)", min_value=1, max_value=100000, value=100)
+
             # Generate the dataset
-            if st.button("Generate Trimmed Dataset"):
-                if not selected_fields:
-                    st.warning("Please select at least one field.")
-                else:
-                    # Randomly sample rows from the original dataset
-                    generated_df = original_dataset[selected_fields].sample(n=num_rows, replace=True)
-                    st.subheader("Generated Dataset:")
-                    st.dataframe(generated_df)
-            
-                    # Download the dataset using st.button and base64
-                    csv = generated_df.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                    href = f'data:file/csv;base64,{b64}'
-                    st.markdown(f'<a href="{href}" download="generated_dataset.csv">Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-                    
-                    st.header("Dataset Overview")
-                    
-                    # Dataset Shape
-                    st.subheader("Dataset Shape:")
-                    st.write(generated_df.shape)
-            
-                    # Column Names
-                    st.subheader("Column Names:")
-                    st.write(generated_df.columns)
-            
-                    # Data Types
-                    st.subheader("Data Types:")
-                    st.write(generated_df.dtypes)
-            
-                    # Summary Statistics
-                    st.subheader("Summary Statistics:")
-                    st.write(generated_df.describe())
+            result = generate_on_click("spec", {"spec": field_specs, "num_rows": num_rows})
+            if result is not None:
+                show_result(result)
+        else:
+            # Input the number of rows
+            num_rows = st.number_input("Enter the number of rows", min_value=1, max_value=500)
 
+            # A single editable grid instead of one input per value
+            st.write("Enter the values in the grid below:")
+            empty_df = pd.DataFrame("", index=range(num_rows), columns=field_names)
+            edited_df = st.data_editor(empty_df, num_rows="dynamic",
+                                       key=f"values_{num_rows}_{'|'.join(field_names)}")
+
+            # Generate the dataset
+            values = {field_name: edited_df[field_name].tolist() for field_name in field_names}
+            result = generate_on_click("values", {"values": values})
+            if result is not None:
+                show_result(result)
+
+    # Page 4: Dataset for Classification (ML)
+    elif page == "Dataset for Classification (ML)":
+        st.title("Dataset for Classification (ML) Page")
+
+        # Select type of output (binary class or multi-class)
+        output_type = st.radio("Select the type of output:", ("Binary Class", "Multi-Class"))
+        if output_type == "Binary Class":
+            dataset_page("classification", "Select a binary classification dataset:", group="Binary Class")
         else:
-            st.warning("The dataset exceeds the size limits (max rows: 5000, max columns: 50).")
-    else:
-        st.error("Please upload a valid dataset to continue.")
+            dataset_page("classification", "Select a multi-class classification dataset:", group="Multi-Class")
 
-# Page 8: About
-elif page == "About":
-    st.title("🚀 About the Dataset Generator App")
-    st.markdown("""
-    Thank you for exploring the Dataset Generator app, a powerful tool designed to simplify the process of creating custom, automatic and machine learning datasets for your data needs! 🎉
+    # Page 5: Dataset for Regression (ML)
+    elif page == "Dataset for Regression (ML)":
+        st.title("Dataset for Regression (ML) Page")
+        dataset_page("regression", "Select a regression dataset:")
 
-    With this app, you can effortlessly generate datasets for various purposes, whether it's for machine learning, data analysis, or testing. Whether you need binary or multi-class datasets, we've got you covered.
-    The app is built using Streamlit and Python, making it easy and user-friendly. It's brought to you by Team AI Hub and is here to help you with your data adventures.
+    # Page 6: Dataset for Clustering (ML)
+    elif page == "Dataset for Clustering (ML)":
+        st.title("Dataset for Clustering (ML) Page")
+        dataset_page("clustering", "Select a clustered dataset:")
 
-    Ready to create and explore our datasets? Let's get started and unlock the possibilities of your data! 💡
-    """)
-    st.markdown("""
-    *_Regards,_*
-    
-    *_Team AI Hub_*
-    """)
+    # Page 7: Dataset for Association (ML)
+    elif page == "Dataset for Association (ML)":
+        st.title("Dataset for Association (ML) Page")
+        dataset_page("association", "Select a association dataset:")
+
+    # Page 7: Dataset Trimmer
+    elif page == "Dataset Trimmer":
+        st.title("Dataset Trimmer Page")
 
+        # Upload a dataset
+        uploaded_file = st.file_uploader("Upload a Dataset", type=["csv"])
+
+        # Initialize the column names as None
+        columns = None
+
+        # Check if a file was uploaded and if it's valid, only its header is read here
+        if uploaded_file is not None:
+            try:
+                columns = peek_columns(uploaded_file)
+            except (ValueError, pd.errors.ParserError):
+                st.error("The uploaded dataset is not in a valid format or language. Please upload a valid dataset in CSV format.")
+                columns = None  # Set columns to None if it's not valid
+
+        if columns:
+
+            # Input fields
+            st.write("Select the fields you want to include in the generated dataset:")
+            selected_fields = st.multiselect("Select field names", columns)
+
+            # Input number of rows, files with fewer rows (or matching rows) are returned whole
+            num_rows = st.number_input("Enter the number of rows", min_value=1, value=500)
+            where = filter_input()
+
+            # Stream the file in chunks, filter each chunk and keep a uniform random sample of the matching rows
+            params = {"source": uploaded_file.name, "fields": selected_fields, "num_rows": num_rows, "where": where}
+            result = generate_on_click("trim", params, label="Generate Trimmed Dataset", files={uploaded_file.name: uploaded_file},
+                                       warning=None if selected_fields else "Please select at least one field.",
+                                       error_message=None if where else "The uploaded dataset is not in a valid format or language. Please upload a valid dataset in CSV format.")
+            if result is not None:
+                show_result(result)
+        else:
+            st.error("Please upload a valid dataset to continue.")
+
+    # Page 8: About
+    elif page == "About":
+        st.title("🚀 About the Dataset Generator App")
+        st.markdown("""
+        Thank you for exploring the Dataset Generator app, a powerful tool designed to simplify the process of creating custom, automatic and machine learning datasets for your data needs! 🎉
+
+        With this app, you can effortlessly generate datasets for various purposes, whether it's for machine learning, data analysis, or testing. Whether you need binary or multi-class datasets, we've got you covered.
+        The app is built using Streamlit and Python, making it easy and user-friendly. It's brought to you by Team AI Hub and is here to help you with your data adventures.
+
+        Ready to create and explore our datasets? Let's get started and unlock the possibilities of your data! 💡
+        """)
+        st.markdown("""
+        *_Regards,_*
+
+        *_Team AI Hub_*
+        """)
+finally:
+    if profiler is not None:
+        runs = st.session_state["debug_profile_runs"] = st.session_state.get("debug_profile_runs", 0) + 1
+        session = st.session_state.setdefault("debug_session", uuid.uuid4().hex[:8])
+        st.session_state["debug_profile_path"] = stop_profile(profiler, f"session_{session}_{runs}")
+    write_metrics()
+if debug:
+    show_debug_panel()
@@ -0,0 +1,204 @@
+"""Transaction baskets for the Association datasets.
+
+Transactions are stored as a boolean sparse item matrix in CSR layout
+(indptr / indices NumPy arrays, one row per transaction, one column per item),
+so whole transactions can be sampled and millions of synthetic baskets kept in
+memory without a dense one-hot table.
+"""
+import numpy as np
+import pandas as pd
+
+from catalog import cached, dataset_key, load_dataset
+from sampling import CHUNK_ROWS, chunk_rngs, chunk_sizes
+
+# How each bundled Association dataset is turned into transactions
+BASKET_LAYOUTS = {
+    "bakery": {"transaction": ["TransactionNo"], "item": "Items"},
+    "groceries": {"transaction": ["Member_number", "Date"], "item": "itemDescription"},
+    "basket_analysis": {"onehot": True, "skip": ["Unnamed: 0"]},
+}
+
+# Share of the items of a synthetic basket drawn from the overall item frequencies
+# instead of the co-occurrences of its first item
+BACKGROUND_WEIGHT = 0.2
+
+
+def _from_pairs(rows, cols, num_rows, items):
+    """Build a CSR basket set from (transaction, item) pairs, dropping repeated items."""
+    order = np.lexsort((cols, rows))
+    rows, cols = rows[order], cols[order]
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    rows, cols = rows[keep], cols[keep]
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    return {"items": np.asarray(items, dtype=object), "indptr": indptr, "indices": cols.astype(np.int32)}
+
+
+def baskets_from_long(df, transaction_columns, item_column):
+    """Group a long table (one row per item) into transactions."""
+    rows = df.groupby(list(transaction_columns), sort=False, observed=True).ngroup().to_numpy()
+    cols, items = pd.factorize(df[item_column], sort=True)
+    present = cols >= 0
+    return _from_pairs(rows[present], cols[present], int(rows.max()) + 1 if len(rows) else 0, items)
+
+
+def baskets_from_onehot(df, item_columns):
+    """Turn a one-hot table (one boolean column per item) into transactions."""
+    rows, cols = np.nonzero(df[list(item_columns)].to_numpy(dtype=bool))
+    return _from_pairs(rows, cols, len(df), list(item_columns))
+
+
+def _build_baskets(source):
+    layout = BASKET_LAYOUTS[source]
+    dataset = load_dataset(source)
+    if layout.get("onehot"):
+        items = [column for column in dataset.columns if column not in layout["skip"]]
+        return baskets_from_onehot(dataset, items)
+    return baskets_from_long(dataset, layout["transaction"], layout["item"])
+
+
+def load_baskets(source):
+    """Return the transactions of a bundled Association dataset, built once per file version."""
+    return cached("baskets", ("baskets", dataset_key(source)), lambda: _build_baskets(source))
+
+
+def load_basket_model(source):
+    """Return the basket model of a bundled Association dataset, fitted once per file version."""
+    return cached("baskets", ("model", dataset_key(source)), lambda: fit_basket_model(load_baskets(source)))
+
+
+def basket_sizes(baskets):
+    return np.diff(baskets["indptr"])
+
+
+def take_transactions(baskets, positions):
+    """Gather whole transactions into a new basket set, without any Python loop per basket."""
+    starts = baskets["indptr"][positions]
+    lengths = basket_sizes(baskets)[positions]
+    indptr = np.zeros(len(positions) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    offsets = np.repeat(starts - indptr[:-1], lengths)
+    indices = baskets["indices"][offsets + np.arange(indptr[-1])]
+    return {"items": baskets["items"], "indptr": indptr, "indices": indices}
+
+
+def sample_transactions(baskets, num_transactions, seed=None, rng=None):
+    """Draw whole transactions with replacement, so items bought together stay together."""
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    positions = rng.integers(0, len(baskets["indptr"]) - 1, size=num_transactions)
+    return take_transactions(baskets, positions)
+
+
+def fit_basket_model(baskets):
+    """Learn basket sizes, item frequencies and item co-occurrences from a basket set."""
+    num_items = len(baskets["items"])
+    sizes = basket_sizes(baskets)
+    frequencies = np.bincount(baskets["indices"], minlength=num_items).astype(float)
+
+    # Co-occurrence counts, from every pair of items in the same basket
+    rows = np.repeat(np.arange(len(sizes)), sizes)
+    first, second = _pairs_within(baskets["indptr"], rows)
+    cooccurrence = np.zeros((num_items, num_items))
+    np.add.at(cooccurrence, (baskets["indices"][first], baskets["indices"][second]), 1)
+    np.fill_diagonal(cooccurrence, 0)
+
+    return {
+        "items": baskets["items"],
+        "sizes": np.bincount(sizes),
+        "frequencies": frequencies / frequencies.sum(),
+        "cooccurrence": cooccurrence,
+    }
+
+
+def _pairs_within(indptr, rows):
+    """Return the positions of every ordered pair of entries belonging to the same row."""
+    lengths = np.diff(indptr)[rows]
+    first = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    second = indptr[rows[first]] + offsets
+    return first, second
+
+
+def synthesize_baskets(model, num_transactions, seed=None, rng=None):
+    """Generate new baskets from a fitted basket model.
+
+    The size of each basket follows the observed size distribution. Its first
+    item is drawn from the item frequencies and the others mostly from the
+    items that co-occur with the first one, so frequent itemsets and
+    association rules keep their strength. Repeated draws within a basket are
+    dropped, so a basket can end up slightly smaller than its drawn size.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    num_items = len(model["items"])
+    size_probabilities = model["sizes"] / model["sizes"].sum()
+    sizes = rng.choice(len(size_probabilities), size=num_transactions, p=size_probabilities)
+    first = rng.choice(num_items, size=num_transactions, p=model["frequencies"])
+
+    # Empty baskets get no first item either
+    filled = np.flatnonzero(sizes > 0)
+    rows = [filled]
+    cols = [first[filled]]
+    extra = np.maximum(sizes - 1, 0)
+    extra_rows = np.repeat(np.arange(num_transactions), extra)
+    extra_first = first[extra_rows]
+    extra_cols = np.empty(len(extra_rows), dtype=np.int64)
+    background = rng.random(len(extra_rows)) < BACKGROUND_WEIGHT
+
+    # Draw the other items per first item, each group in one vectorized call
+    related = np.flatnonzero(~background)
+    related = related[np.argsort(extra_first[related], kind="stable")]
+    group_items, group_starts = np.unique(extra_first[related], return_index=True)
+    for item, chosen in zip(group_items, np.split(related, group_starts[1:])):
+        weights = model["cooccurrence"][item]
+        if weights.sum() > 0:
+            extra_cols[chosen] = rng.choice(num_items, size=len(chosen), p=weights / weights.sum())
+        else:
+            background[chosen] = True
+    background_rows = np.flatnonzero(background)
+    extra_cols[background_rows] = rng.choice(num_items, size=len(background_rows), p=model["frequencies"])
+
+    rows.append(extra_rows)
+    cols.append(extra_cols)
+    return _from_pairs(np.concatenate(rows), np.concatenate(cols), num_transactions, model["items"])
+
+
+def to_long(baskets, item_column="Item", transaction_column="Transaction", first_transaction=1):
+    """Return a basket set as a long table with one row per (transaction, item)."""
+    sizes = basket_sizes(baskets)
+    transactions = np.repeat(np.arange(first_transaction, first_transaction + len(sizes)), sizes)
+    items = pd.Categorical.from_codes(baskets["indices"], categories=baskets["items"])
+    return pd.DataFrame({transaction_column: transactions, item_column: items})
+
+
+def to_onehot(baskets):
+    """Return a basket set as a dense boolean table with one column per item."""
+    sizes = basket_sizes(baskets)
+    dense = np.zeros((len(sizes), len(baskets["items"])), dtype=bool)
+    dense[np.repeat(np.arange(len(sizes)), sizes), baskets["indices"]] = True
+    return pd.DataFrame(dense, columns=list(baskets["items"]))
+
+
+def to_frame(source, baskets, first_transaction=1):
+    """Return generated baskets in the same layout as the bundled dataset they come from."""
+    layout = BASKET_LAYOUTS[source]
+    if layout.get("onehot"):
+        return to_onehot(baskets)
+    return to_long(baskets, item_column=layout["item"], first_transaction=first_transaction)
+
+
+def iter_basket_chunks(source, num_transactions, synthetic=False, seed=None, chunk_rows=CHUNK_ROWS):
+    """Yield sampled or synthetic transactions of a bundled dataset as DataFrame chunks."""
+    baskets = load_baskets(source)
+    model = load_basket_model(source) if synthetic else None
+    sizes = chunk_sizes(num_transactions, chunk_rows)
+    first_transaction = 1
+    for size, rng in zip(sizes, chunk_rngs(seed, len(sizes))):
+        if synthetic:
+            chunk = synthesize_baskets(model, size, rng=rng)
+        else:
+            chunk = sample_transactions(baskets, size, rng=rng)
+        yield to_frame(source, chunk, first_transaction)
+        first_transaction += size
@@ -0,0 +1,320 @@
+"""Benchmarks of the hot paths: CSV load, column projection, sampling, overview and export.
+
+Every bundled dataset is scaled up by repeating its rows (1x, 10x and 100x by
+default) into a temporary folder. Each benchmark runs once in a fresh
+process while a thread samples its resident memory (the peak growth covers
+NumPy, pandas and Arrow buffers alike, and does not depend on what earlier
+benchmarks left in the allocator), then is timed over a few more runs, keeping
+the median. Results are compared with a baseline recorded on the same machine,
+and the run fails when a benchmark got slower or bigger than the threshold
+allows, so the effect of a change is visible before it is deployed.
+
+Examples:
+    python benchmark.py --scales 1 10 --compare
+    python benchmark.py --datasets iris house_price --benchmarks load export:parquet
+    python benchmark.py --save            # record a baseline on this machine (not committed)
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from catalog import (BASE_DIR, DATASET_PATHS, build_sidecar, clear_cache, infer_schema, load_columns, load_dataset,
+                     read_schema, resolve_path, write_schema)
+from export import EXPORT_FORMATS, export_buffer
+from profiling import compute_overview
+from sampling import sample_rows
+
+SCALES = [1, 10, 100]
+
+# Timed runs per benchmark, the median one is kept
+REPEAT = 5
+
+# Relative slowdown (or memory growth) over the baseline that fails the comparison
+THRESHOLD = 0.25
+
+# Benchmarks faster than this are not compared on time, their timing is mostly noise
+MIN_COMPARED_SECONDS = 0.05
+
+# Memory growth allowed on top of the threshold, small peaks vary with the allocator and the sampling interval
+MEMORY_SLACK_BYTES = 8 * 1024 * 1024
+
+# Seconds between two samples of the resident memory
+MEMORY_INTERVAL = 0.002
+
+# Baselines are specific to the machine they were recorded on, so this file is not committed
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmark_baseline.json")
+
+
+def scale_csv(path, scale, folder):
+    """Write a copy of a CSV file with its rows repeated scale times, return its path."""
+    with open(resolve_path(path), "rb") as fileobj:
+        header = fileobj.readline()
+        body = fileobj.read()
+    if body and not body.endswith(b"\n"):
+        body += b"\n"
+    scaled_path = os.path.join(folder, f"{os.path.splitext(os.path.basename(path))[0]}_x{scale}.csv")
+    with open(scaled_path, "wb") as fileobj:
+        fileobj.write(header)
+        for _ in range(scale):
+            fileobj.write(body)
+    return scaled_path
+
+
+def _load(case):
+    clear_cache()
+    load_dataset(case["path"])
+
+
+def _columns(case):
+    load_columns(case["path"], case["columns"])
+
+
+def _sample(case):
+    sample_rows(case["df"], len(case["df"]), case["columns"], seed=0)
+
+
+def _overview(case):
+    compute_overview(case["df"])
+
+
+def _export(fmt):
+    def run(case):
+        export_buffer(case["df"], fmt).close()
+    return run
+
+
+# Benchmarks by name, each taking a prepared case (scaled file, its DataFrame and half of its columns)
+BENCHMARKS = {
+    "load": _load,
+    "columns": _columns,
+    "sample": _sample,
+    "overview": _overview,
+}
+for _fmt in EXPORT_FORMATS:
+    BENCHMARKS[f"export:{_fmt}"] = _export(_fmt)
+
+
+def open_case(path):
+    """Warm up what the app keeps between reruns for a CSV file: the schema, the sidecar and the parsed frame."""
+    # The catalog only stores schemas of the bundled datasets, the scaled copies get theirs here
+    if read_schema(path) is None:
+        write_schema(path, infer_schema(pd.read_csv(path)))
+    df = load_dataset(path)
+    build_sidecar(path)
+    return {
+        "path": path,
+        "df": df,
+        "columns": list(df.columns[:max(1, len(df.columns) // 2)]),
+        "bytes": os.path.getsize(path),
+    }
+
+
+def prepare_case(path, scale, folder):
+    """Scale a dataset into folder and open it as a case."""
+    return open_case(scale_csv(path, scale, folder))
+
+
+def _resident_bytes():
+    """Return the resident memory of the process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as fileobj:
+            return int(fileobj.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _release_memory():
+    """Give freed memory back to the system, so a peak does not depend on what earlier benchmarks left behind."""
+    gc.collect()
+    libc = ctypes.util.find_library("c")
+    if libc and sys.platform.startswith("linux"):
+        ctypes.CDLL(libc).malloc_trim(0)
+
+
+def peak_memory(benchmark, case):
+    """Run a benchmark once and return how far the process memory grew above its level at the start.
+
+    The resident memory is sampled from a thread; without /proc, tracemalloc
+    is used instead, which misses Arrow buffers and slows pandas' CSV writer
+    down a lot.
+    """
+    _release_memory()
+    start = _resident_bytes()
+    if start is None:
+        tracemalloc.start()
+        try:
+            benchmark(case)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    peak = [start]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(MEMORY_INTERVAL):
+            peak[0] = max(peak[0], _resident_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        benchmark(case)
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak[0], _resident_bytes()) - start
+
+
+def _case_peak_memory(name, path):
+    """Open a case and return the peak memory of one run of a benchmark on it, run in a fresh process."""
+    return peak_memory(BENCHMARKS[name], open_case(path))
+
+
+def isolated_peak_memory(name, case):
+    """Return the peak memory growth of one run of a named benchmark, measured in a newly spawned process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_case_peak_memory, name, case["path"]).result()
+
+
+def measure(name, case, repeat=REPEAT):
+    """Return the peak memory growth of a run in a fresh process and the median time of repeat runs here."""
+    peak = isolated_peak_memory(name, case)
+    benchmark = BENCHMARKS[name]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        benchmark(case)
+        timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+    return {
+        "seconds": seconds,
+        "rows": len(case["df"]),
+        "rows_per_second": len(case["df"]) / seconds if seconds else None,
+        "mb_per_second": case["bytes"] / 1e6 / seconds if seconds else None,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(datasets, scales, names, repeat=REPEAT, report=None):
+    """Run the named benchmarks on every dataset and scale, return the results keyed by 'benchmark/dataset/xN'."""
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for dataset in datasets:
+            for scale in scales:
+                case = prepare_case(DATASET_PATHS[dataset], scale, folder)
+                for name in names:
+                    key = f"{name}/{dataset}/x{scale}"
+                    results[key] = measure(name, case, repeat)
+                    if report:
+                        report(key, results[key])
+                clear_cache()
+    return results
+
+
+def environment():
+    """Describe the machine and libraries, results are only comparable on the same ones."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Return (key, what, ratio) for every benchmark slower or bigger than its baseline allows."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if previous["seconds"] >= MIN_COMPARED_SECONDS and result["seconds"] > previous["seconds"] * (1 + threshold):
+            regressions.append((key, "time", result["seconds"] / previous["seconds"]))
+        if result["peak_bytes"] > previous["peak_bytes"] * (1 + threshold) + MEMORY_SLACK_BYTES:
+            regressions.append((key, "memory", result["peak_bytes"] / max(previous["peak_bytes"], 1)))
+    return regressions
+
+
+def format_result(key, result, previous=None):
+    line = (f"{key:<40} {result['seconds'] * 1000:10.1f} ms {result['rows_per_second'] or 0:14,.0f} rows/s "
+            f"{result['mb_per_second'] or 0:8.1f} MB/s {result['peak_bytes'] / 1e6:9.1f} MB peak")
+    if previous:
+        line += (f"  (time {result['seconds'] / previous['seconds'] - 1:+.0%}, "
+                 f"memory {(result['peak_bytes'] - previous['peak_bytes']) / 1e6:+.1f} MB)")
+    return line
+
+
+def load_baseline(path):
+    with open(path) as fileobj:
+        return json.load(fileobj)
+
+
+def save_baseline(results, path):
+    with open(path, "w") as fileobj:
+        json.dump({"environment": environment(), "results": results}, fileobj, indent=1, sort_keys=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark", description="Time the load, sample, profile and export paths.")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASET_PATHS), default=list(DATASET_PATHS),
+                        help="bundled datasets to run on (default: all)")
+    parser.add_argument("--scales", nargs="+", type=int, default=SCALES, help="row multipliers of every dataset")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per benchmark, the median is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file for --compare and --save")
+    parser.add_argument("--compare", action="store_true", help="fail when a benchmark regressed against the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed relative slowdown or memory growth (default: 0.25)")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--out", help="also write the results (JSON) to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    baseline = {}
+    if args.compare:
+        try:
+            stored = load_baseline(args.baseline)
+        except OSError:
+            raise SystemExit(f"No baseline at {args.baseline}, record one on this machine with --save first.")
+        baseline = stored["results"]
+        if stored.get("environment") != environment():
+            print("warning: the baseline was recorded on another machine or library versions", file=sys.stderr)
+
+    results = run_benchmarks(args.datasets, args.scales, args.benchmarks, args.repeat,
+                             report=lambda key, result: print(format_result(key, result, baseline.get(key)), flush=True))
+    if args.out:
+        save_baseline(results, args.out)
+    if args.save:
+        save_baseline(results, args.baseline)
+
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold)
+        for key, what, ratio in regressions:
+            print(f"REGRESSION {key}: {what} x{ratio:.2f}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""Dataset catalog: loads the bundled CSV files once per process and shares them."""
+import glob
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from instrumentation import stage
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bundled CSV files that get a columnar sidecar from build_sidecars()
+BUNDLED_PATTERNS = ["data.csv", os.path.join("Datasets for ML", "*", "*.csv")]
+SIDECAR_EXT = ".feather"
+
+# Optimized dtypes are stored next to each dataset in a small JSON file
+SCHEMA_EXT = ".schema.json"
+
+# String columns with at most this ratio of distinct values are stored as categories
+CATEGORY_MAX_RATIO = 0.5
+
+# Bundled datasets by short name: title shown in the app, task (and group) of the page listing them, CSV
+# path, label column (class, regression target or cluster) and the columns every random sample keeps
+DATASETS = {
+    "data": {"title": "Sample Dataset", "task": None, "path": "data.csv"},
+    "heart_disease": {"title": "Heart Disease Dataset", "task": "classification", "group": "Binary Class",
+                      "path": "Datasets for ML/Classification/heart_disease_data.csv", "label": "target"},
+    "diabetes": {"title": "Diabetes Dataset", "task": "classification", "group": "Binary Class",
+                 "path": "Datasets for ML/Classification/diabetes_data.csv", "label": "Outcome"},
+    "iris": {"title": "Iris Dataset", "task": "classification", "group": "Multi-Class",
+             "path": "Datasets for ML/Classification/iris_data.csv", "label": "species"},
+    "acoustic_features": {"title": "Acoustic Features Dataset", "task": "classification", "group": "Multi-Class",
+                          "path": "Datasets for ML/Classification/acoustic_features_data.csv", "label": "Class"},
+    "car_price": {"title": "Car Price Dataset", "task": "regression",
+                  "path": "Datasets for ML/Regression/car_price_data.csv", "label": "price"},
+    "electricity": {"title": "Electricity Dataset", "task": "regression",
+                    "path": "Datasets for ML/Regression/electricity_data.csv", "label": "Revenue.Total"},
+    "house_price": {"title": "House Price Dataset", "task": "regression",
+                    "path": "Datasets for ML/Regression/house_price_data.csv", "label": "median_house_value"},
+    "clustered_1": {"title": "Sample Dataset 1", "task": "clustering", "path": "Datasets for ML/Clustering/clustered_data_1.csv",
+                    "label": "Cluster", "mandatory": ["Cluster"]},
+    "clustered_2": {"title": "Sample Dataset 2", "task": "clustering", "path": "Datasets for ML/Clustering/clustered_data_2.csv",
+                    "label": "Cluster", "mandatory": ["Cluster"]},
+    "clustered_3": {"title": "Sample Dataset 3", "task": "clustering", "path": "Datasets for ML/Clustering/clustered_data_3.csv",
+                    "label": "Cluster", "mandatory": ["Cluster"]},
+    "bakery": {"title": "Bakery Dataset", "task": "association", "path": "Datasets for ML/Association/bakery_data.csv"},
+    "basket_analysis": {"title": "Basket Analysis Dataset", "task": "association",
+                        "path": "Datasets for ML/Association/basket_analysis_data.csv"},
+    "groceries": {"title": "Groceries Dataset", "task": "association", "path": "Datasets for ML/Association/groceries_data.csv"},
+}
+
+# Short names of the bundled datasets, used by the command line and batch jobs
+DATASET_PATHS = {name: dataset["path"] for name, dataset in DATASETS.items()}
+
+# Bytes read at a time when hashing a file
+HASH_BLOCK_BYTES = 1 << 20
+
+# Parsed datasets keyed by absolute path -> ((mtime, size), DataFrame)
+_cache = {}
+_lock = threading.Lock()
+
+# Content hashes keyed by dataset_key()
+_hashes = {}
+
+# Entries kept in each namespace of cached()
+CACHE_SIZE = 32
+
+# Results derived from datasets (models, indexes, masks, overviews, ...) by namespace, see cached()
+_derived = {}
+_derived_lock = threading.Lock()
+
+
+def resolve_path(path):
+    """Return the absolute path of a dataset, relative paths are taken from the app folder.
+
+    The short names in DATASET_PATHS are accepted as well.
+    """
+    path = DATASET_PATHS.get(path, path)
+    if os.path.isabs(path):
+        return path
+    return os.path.join(BASE_DIR, path)
+
+
+def task_datasets(task, group=None):
+    """Return the short names of the bundled datasets of a task, and of a group within it if given."""
+    return [name for name, dataset in DATASETS.items()
+            if dataset["task"] == task and (group is None or dataset.get("group") == group)]
+
+
+def dataset_name(path):
+    """Return the short name of a bundled dataset given its name or path, or None."""
+    full_path = resolve_path(path)
+    for name, bundled_path in DATASET_PATHS.items():
+        if resolve_path(bundled_path) == full_path:
+            return name
+    return None
+
+
+def file_version(path):
+    """Return (mtime, size) of a file, used to notice when it changes on disk."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def dataset_key(path):
+    """Return a key identifying the current version of a dataset file, for caches."""
+    full_path = resolve_path(path)
+    return (full_path,) + file_version(full_path)
+
+
+def cached(namespace, key, build):
+    """Return build() cached under key, keeping the CACHE_SIZE most recently used entries of each namespace.
+
+    The key must change whenever the inputs change, e.g. by including the
+    dataset_key() of the source. build runs outside the lock, so a slow build
+    does not hold up lookups in other namespaces.
+    """
+    with _derived_lock:
+        entries = _derived.setdefault(namespace, OrderedDict())
+        if key in entries:
+            entries.move_to_end(key)
+            return entries[key]
+    value = build()
+    with _derived_lock:
+        entries[key] = value
+        while len(entries) > CACHE_SIZE:
+            entries.popitem(last=False)
+    return value
+
+
+def _hash_stream(fileobj):
+    digest = hashlib.sha256()
+    for block in iter(lambda: fileobj.read(HASH_BLOCK_BYTES), b""):
+        digest.update(block)
+    return "sha256:" + digest.hexdigest()
+
+
+def file_hash(source):
+    """Return the SHA-256 of a dataset's bytes, computed once per file version.
+
+    source can be a path, a short name or a binary file object (e.g. a Streamlit upload).
+    """
+    if hasattr(source, "read"):
+        source.seek(0)
+        value = _hash_stream(source)
+        source.seek(0)
+        return value
+    key = dataset_key(source)
+    with _lock:
+        if key in _hashes:
+            return _hashes[key]
+    with open(key[0], "rb") as fileobj:
+        value = _hash_stream(fileobj)
+    with _lock:
+        _hashes[key] = value
+    return value
+
+
+def infer_schema(df):
+    """Return the compact dtypes of the columns that can be stored more efficiently.
+
+    Repetitive string columns become categories and integers get the smallest
+    width holding their range. Floats stay float64, float32 would change how
+    the values are written back to CSV.
+    """
+    schema = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_string_dtype(series) or series.dtype == object:
+            if len(series) and series.nunique() <= CATEGORY_MAX_RATIO * len(series):
+                schema[column] = "category"
+        elif pd.api.types.is_integer_dtype(series):
+            downcast = pd.to_numeric(series, downcast="integer")
+            if downcast.dtype != series.dtype:
+                schema[column] = str(downcast.dtype)
+    return schema
+
+
+def schema_path(path):
+    """Return the path of the stored schema of a CSV dataset."""
+    return os.path.splitext(resolve_path(path))[0] + SCHEMA_EXT
+
+
+def read_schema(path):
+    """Return the stored schema of a dataset, or None when missing or stale."""
+    full_path = resolve_path(path)
+    try:
+        with open(schema_path(full_path)) as fileobj:
+            stored = json.load(fileobj)
+    except (OSError, ValueError):
+        return None
+    if [stored.get("source_mtime"), stored.get("source_size")] != list(file_version(full_path)):
+        return None
+    return stored.get("dtypes")
+
+
+def write_schema(path, schema):
+    """Store the schema of a dataset next to it, silently skipped when the folder is read-only."""
+    full_path = resolve_path(path)
+    mtime, size = file_version(full_path)
+    try:
+        with open(schema_path(full_path), "w") as fileobj:
+            json.dump({"source_mtime": mtime, "source_size": size, "dtypes": schema}, fileobj, indent=1)
+    except OSError:
+        pass
+
+
+def load_dataset(path):
+    """Load a CSV dataset, parsing it only once per process.
+
+    The returned DataFrame is shared between all sessions, so callers must
+    treat it as read-only (select / sample / copy it, never modify it in place).
+    The file is parsed again automatically when its mtime or size changes.
+    Columns use the compact dtypes from infer_schema(), stored next to the
+    bundled datasets only, so other files (uploads, --source paths) leave no
+    files behind and have theirs inferred on every parse.
+    """
+    full_path = resolve_path(path)
+    version = file_version(full_path)
+
+    entry = _cache.get(full_path)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _lock:
+        # Another thread may have loaded it while we were waiting
+        entry = _cache.get(full_path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        schema = read_schema(full_path)
+        with stage("load", dataset=os.path.basename(full_path)):
+            if schema is not None:
+                dataset = pd.read_csv(full_path, dtype=schema)
+            else:
+                dataset = pd.read_csv(full_path)
+                schema = infer_schema(dataset)
+                dataset = dataset.astype(schema)
+                if full_path in bundled_paths():
+                    write_schema(full_path, schema)
+        _cache[full_path] = (version, dataset)
+        return dataset
+
+
+def clear_cache():
+    """Drop every cached dataset and everything derived from them."""
+    with _lock:
+        _cache.clear()
+        _hashes.clear()
+    with _derived_lock:
+        _derived.clear()
+
+
+def bundled_paths():
+    """Return the absolute paths of every bundled CSV dataset."""
+    paths = []
+    for pattern in BUNDLED_PATTERNS:
+        paths.extend(sorted(glob.glob(os.path.join(BASE_DIR, pattern))))
+    return paths
+
+
+def sidecar_path(path):
+    """Return the path of the columnar sidecar file for a CSV dataset."""
+    return os.path.splitext(resolve_path(path))[0] + SIDECAR_EXT
+
+
+def build_sidecar(path):
+    """Convert a CSV dataset into an uncompressed Feather (Arrow IPC) sidecar.
+
+    The CSV version is stored in the file metadata so stale sidecars are ignored.
+    Uncompressed Feather files can be memory-mapped and read column by column.
+    """
+    full_path = resolve_path(path)
+    mtime, size = file_version(full_path)
+    table = pa.Table.from_pandas(load_dataset(full_path), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"source_mtime"] = str(mtime).encode()
+    metadata[b"source_size"] = str(size).encode()
+    table = table.replace_schema_metadata(metadata)
+    out_path = sidecar_path(full_path)
+    tmp_path = out_path + ".tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def build_sidecars(paths=None):
+    """Build sidecars for the given CSV files (all bundled datasets by default)."""
+    return [build_sidecar(path) for path in (paths or bundled_paths())]
+
+
+def _open_sidecar(path):
+    """Return a memory-mapped reader for a fresh sidecar, or None if there is none."""
+    full_path = resolve_path(path)
+    side_path = sidecar_path(full_path)
+    if not os.path.exists(side_path):
+        return None
+    reader = pa.ipc.open_file(pa.memory_map(side_path, "r"))
+    metadata = reader.schema.metadata or {}
+    mtime, size = file_version(full_path)
+    if (metadata.get(b"source_mtime") != str(mtime).encode()
+            or metadata.get(b"source_size") != str(size).encode()):
+        return None
+    return reader
+
+
+def dataset_columns(path):
+    """Return the column names of a dataset without loading its rows."""
+    reader = _open_sidecar(path)
+    if reader is not None:
+        return list(reader.schema.names)
+    return list(pd.read_csv(resolve_path(path), nrows=0).columns)
+
+
+def dataset_shape(path):
+    """Return (rows, columns) of a dataset, read from the sidecar when available."""
+    reader = _open_sidecar(path)
+    if reader is not None:
+        num_rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        return num_rows, len(reader.schema.names)
+    return load_dataset(path).shape
+
+
+def load_columns(path, columns, rows=None):
+    """Load only the given columns of a dataset, and only the rows at the given positions if rows is set.
+
+    Reads the memory-mapped sidecar when one is up to date, otherwise falls
+    back to projecting the cached CSV frame. Rows keep their position in the
+    dataset as index.
+    """
+    columns = list(columns)
+    reader = _open_sidecar(path)
+    if reader is None:
+        dataset = load_dataset(path)
+        with stage("project", columns=len(columns)):
+            return dataset[columns] if rows is None else dataset[columns].take(rows)
+    if not columns:
+        return pd.DataFrame(index=pd.RangeIndex(dataset_shape(path)[0]) if rows is None else pd.Index(rows))
+    with stage("project", columns=len(columns)):
+        table = reader.read_all().select(columns)
+        if rows is None:
+            return table.to_pandas()
+        df = table.take(rows).to_pandas()
+        df.index = pd.Index(rows)
+        return df
+
+
+if __name__ == "__main__":
+    for built in build_sidecars():
+        print(built)
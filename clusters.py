@@ -0,0 +1,122 @@
+"""Cluster-preserving synthesizer for the Clustering datasets.
+
+A model holds the centroid, covariance and weight of every labeled cluster.
+New labeled points are drawn from one multivariate normal per cluster, so any
+number of points can be generated, with more clusters or a different
+separation between them if needed for scalability benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+from catalog import cached, dataset_key, load_columns
+from sampling import CHUNK_ROWS, chunk_rngs, chunk_sizes, square_root
+
+LABEL_COLUMN = "Cluster"
+
+
+def _covariance(values):
+    if len(values) < 2:
+        return np.zeros((values.shape[1], values.shape[1]))
+    return np.atleast_2d(np.cov(values, rowvar=False))
+
+
+def fit_clusters(df, label_column=LABEL_COLUMN):
+    """Fit the centroid, covariance and weight of every cluster of a labeled DataFrame."""
+    features = [column for column in df.columns if column != label_column]
+    values = df[features].to_numpy(dtype=float)
+    labels = df[label_column].to_numpy()
+    cluster_labels, counts = np.unique(labels, return_counts=True)
+
+    means = np.array([values[labels == label].mean(axis=0) for label in cluster_labels])
+    weights = counts / counts.sum()
+    overall = values.mean(axis=0)
+    offsets = means - overall
+    between = (weights[:, None] * offsets).T @ offsets
+    if len(cluster_labels) < 2:
+        between = _covariance(values)
+
+    return {
+        "label_column": label_column,
+        "features": features,
+        "dtypes": [str(df[column].dtype) for column in features],
+        "minimum": values.min(axis=0),
+        "maximum": values.max(axis=0),
+        "labels": cluster_labels,
+        "means": means,
+        "covariances": np.array([_covariance(values[labels == label]) for label in cluster_labels]),
+        "weights": weights,
+        "overall_mean": overall,
+        "between_covariance": between,
+    }
+
+
+def get_cluster_model(source, fields, label_column=LABEL_COLUMN):
+    """Return the cluster model of the selected fields of a dataset, fitted once per file version."""
+    fields = list(fields)
+    if label_column not in fields:
+        fields.append(label_column)
+    key = (dataset_key(source), tuple(fields))
+    return cached("clusters", key, lambda: fit_clusters(load_columns(source, fields), label_column))
+
+
+def cluster_layout(model, num_clusters=None, separation=1.0, seed=None, rng=None):
+    """Place the clusters to generate.
+
+    separation scales the distance of every centroid from the overall mean
+    (1 keeps the fitted layout). With num_clusters above the fitted count, the
+    extra centroids are drawn from the spread of the fitted centroids and
+    borrow the fitted covariances in turn; all clusters then get equal weight.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    fitted = len(model["labels"])
+    num_clusters = num_clusters or fitted
+    means = model["means"][:num_clusters]
+    labels = list(model["labels"][:num_clusters])
+    if num_clusters > fitted:
+        extra = rng.multivariate_normal(model["overall_mean"], model["between_covariance"],
+                                        size=num_clusters - fitted, method="eigh")
+        means = np.vstack([means, extra])
+        next_label = int(np.max(model["labels"])) + 1
+        labels += list(range(next_label, next_label + num_clusters - fitted))
+    if num_clusters == fitted:
+        weights = model["weights"]
+    else:
+        weights = np.full(num_clusters, 1 / num_clusters)
+
+    centers = model["overall_mean"] + separation * (means - model["overall_mean"])
+    roots = [square_root(model["covariances"][i % fitted]) for i in range(num_clusters)]
+    return {"model": model, "labels": labels, "centers": centers, "roots": roots, "weights": weights}
+
+
+def sample_layout(layout, num_points, seed=None, rng=None):
+    """Draw labeled points from a cluster layout, one vectorized normal draw per cluster."""
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    model = layout["model"]
+    assignment = rng.choice(len(layout["weights"]), size=num_points, p=layout["weights"])
+    values = np.empty((num_points, len(model["features"])))
+    for cluster in range(len(layout["weights"])):
+        rows = np.flatnonzero(assignment == cluster)
+        noise = rng.standard_normal((len(rows), len(model["features"])))
+        values[rows] = layout["centers"][cluster] + noise @ layout["roots"][cluster].T
+
+    # Give every column back the type of its source column
+    data = {}
+    for i, (column, dtype) in enumerate(zip(model["features"], model["dtypes"])):
+        if dtype == "bool":
+            data[column] = values[:, i] > 0.5
+        elif np.issubdtype(np.dtype(dtype), np.integer):
+            data[column] = np.clip(np.rint(values[:, i]), model["minimum"][i], model["maximum"][i]).astype(dtype)
+        else:
+            data[column] = values[:, i]
+    data[model["label_column"]] = np.asarray(layout["labels"])[assignment]
+    return pd.DataFrame(data)
+
+
+def iter_cluster_chunks(model, num_points, num_clusters=None, separation=1.0, seed=None, chunk_rows=CHUNK_ROWS):
+    """Yield synthetic labeled points in chunks; the cluster layout is shared by all chunks."""
+    layout = cluster_layout(model, num_clusters, separation, seed=seed)
+    sizes = chunk_sizes(num_points, chunk_rows)
+    for size, rng in zip(sizes, chunk_rngs(seed, len(sizes))):
+        yield sample_layout(layout, size, rng=rng)
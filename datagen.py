@@ -0,0 +1,381 @@
+"""Command line entry point for generating datasets without the Streamlit app.
+
+Examples:
+    python datagen.py list
+    python datagen.py sample --source house_price --fields median_income ocean_proximity --rows 10000000 --seed 7 --out houses.csv
+    python datagen.py synth --source house_price --rows 10000000 --seed 7 --save-model houses.json --out houses.csv
+    python datagen.py regression --features 3 --coefficients 2 -1 0.5 --noise 0.1 --rows 100000000 --workers 0 --out reg.csv
+    python datagen.py stratify --source diabetes --rows 1000000 --proportions balanced --smote --out diabetes.csv
+    python datagen.py timeseries --source bakery --days 90 --scale 10 --seed 7 --out bakery_stream.parquet
+    python datagen.py clusters --source clustered_2 --rows 1000000 --clusters 20 --separation 2 --out points.parquet
+    python datagen.py trim --input big.csv --fields a b --rows 1000 --out small.csv
+    python datagen.py sample --source house_price --where "ocean_proximity == 'NEAR BAY' and median_income > 5" --rows 1000
+    python datagen.py sample --source iris --rows 1000 --manifest iris.manifest.json --out iris.csv
+    python datagen.py replay --manifest iris.manifest.json --out iris.csv
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from baskets import BASKET_LAYOUTS
+from catalog import DATASET_PATHS, build_sidecars, dataset_columns
+from clusters import LABEL_COLUMN
+from export import EXPORT_FORMATS, format_from_path, write_dataset
+from generators import custom_dataset, entire_dataset
+from manifest import check_manifest, library_warnings, load_manifest, make_manifest, replay_to_file, save_manifest, write_generated
+from metadata import INDEX_PATH, build_index, dataset_info
+from regression import (NONLINEARITIES, TARGET_COLUMNS, adjust_model, get_regression_model, load_model as load_regression_model,
+                        make_regression_model, save_model as save_regression_model, target_function)
+from sampling import new_seed
+from stratify import LABEL_COLUMNS, PROPORTIONS, get_class_index
+from synth import get_model, load_model, save_model
+from timeseries import TIME_LAYOUTS
+from trimmer import peek_columns
+
+
+@contextlib.contextmanager
+def open_output(path):
+    """Open the output file for binary writing, '-' means standard output."""
+    if path == "-":
+        yield sys.stdout.buffer
+    else:
+        with open(path, "wb") as fileobj:
+            yield fileobj
+
+
+def output_format(args):
+    """Return the export format given with --format, or guessed from the --out file name."""
+    return args.format or format_from_path(args.out)
+
+
+def write_output(args, generator, params):
+    """Generate into --out, then save a replay manifest if --manifest is given."""
+    # Without --seed a seed is drawn here, so the manifest can still replay the output
+    seed = args.seed if args.seed is not None else new_seed()
+    with open_output(args.out) as fileobj:
+        try:
+            write_generated(generator, params, seed, fileobj, output_format(args), workers=getattr(args, "workers", 1))
+        except ValueError as error:
+            raise SystemExit(str(error))
+    if args.manifest:
+        save_manifest(make_manifest(generator, params, seed), args.manifest)
+
+
+def cmd_list(args):
+    for name, path in DATASET_PATHS.items():
+        info = dataset_info(name)
+        print(f"{name}: {info['rows']} rows x {len(info['columns'])} columns ({path})")
+
+
+def cmd_columns(args):
+    info = dataset_info(args.source)
+    for column in info["columns"] if info is not None else dataset_columns(args.source):
+        print(column)
+
+
+def cmd_sample(args):
+    fields = args.fields or dataset_columns(args.source)
+    write_output(args, "sample", {"source": args.source, "fields": fields, "num_rows": args.rows,
+                                  "chunk_rows": args.chunk_rows, "where": args.where})
+
+
+def cmd_synth(args):
+    if args.model:
+        model = load_model(args.model)
+        params = {"model": model}
+    else:
+        fields = args.fields or dataset_columns(args.source)
+        model = get_model(args.source, fields, correlated=not args.independent)
+        params = {"source": args.source, "fields": fields, "correlated": not args.independent}
+    if args.save_model:
+        save_model(model, args.save_model)
+    if args.rows:
+        write_output(args, "synthesize", dict(params, num_rows=args.rows, chunk_rows=args.chunk_rows))
+
+
+def cmd_regression(args):
+    if args.model:
+        model = load_regression_model(args.model)
+    elif args.source:
+        model = get_regression_model(args.source, args.fields)
+    else:
+        model = make_regression_model(args.coefficients or [1.0] * args.features)
+    if args.coefficients is not None and len(args.coefficients) != len(model["features"]):
+        raise SystemExit(f"Give {len(model['features'])} coefficients, one per feature: {', '.join(model['features'])}")
+    model = adjust_model(model, args.coefficients, args.intercept, args.noise, args.nonlinearity)
+
+    # The ground truth is saved next to the data unless it goes to standard output
+    truth = args.truth or (args.out + ".truth.json" if args.out != "-" else None)
+    if truth:
+        save_regression_model(dict(model, target_function=target_function(model)), truth)
+    params = {"model": model, "num_rows": args.rows, "chunk_rows": args.chunk_rows}
+    if args.source:
+        params["source"] = args.source
+    write_output(args, "regression", params)
+
+
+def parse_proportions(source, text):
+    """Turn 'original', 'balanced' or 'CLASS=WEIGHT,...' into class proportions."""
+    if text in PROPORTIONS:
+        return text
+    # Classes are kept as text, which stratify.class_weights() matches and manifests can store
+    classes = [str(value) for value in get_class_index(source)["classes"]]
+    proportions = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in classes:
+            raise SystemExit(f"Unknown class '{name}', expected one of: {', '.join(classes)}")
+        proportions[name] = float(weight)
+    return proportions
+
+
+def cmd_stratify(args):
+    fields = args.fields or [column for column in dataset_columns(args.source) if column != LABEL_COLUMNS[args.source]]
+    write_output(args, "stratified", {"source": args.source, "fields": fields, "num_rows": args.rows,
+                                      "proportions": parse_proportions(args.source, args.proportions),
+                                      "smote": args.smote, "chunk_rows": args.chunk_rows})
+
+
+def cmd_baskets(args):
+    write_output(args, "baskets", {"source": args.source, "num_rows": args.transactions, "synthetic": args.synthetic,
+                                   "chunk_rows": args.chunk_rows})
+
+
+def cmd_timeseries(args):
+    write_output(args, "timeseries", {"source": args.source, "num_days": args.days, "start": args.start,
+                                      "scale": args.scale, "chunk_days": args.chunk_days})
+
+
+def cmd_clusters(args):
+    fields = args.fields or [column for column in dataset_columns(args.source) if column != LABEL_COLUMN]
+    write_output(args, "clusters", {"source": args.source, "fields": fields, "num_rows": args.rows,
+                                    "num_clusters": args.clusters, "separation": args.separation,
+                                    "chunk_rows": args.chunk_rows})
+
+
+def cmd_entire(args):
+    with open_output(args.out) as fileobj:
+        write_dataset(entire_dataset(args.source), fileobj, output_format(args))
+
+
+def cmd_custom(args):
+    if args.spec:
+        with open(args.spec) as fileobj:
+            field_specs = json.load(fileobj)
+        write_output(args, "spec", {"spec": field_specs, "num_rows": args.rows})
+        return
+    if not args.field:
+        raise SystemExit("Either --spec or --field is required.")
+    field_values = {}
+    for spec in args.field:
+        field_name, _, values = spec.partition("=")
+        field_values[field_name] = values.split(",")
+    lengths = {len(values) for values in field_values.values()}
+    if len(lengths) > 1:
+        raise SystemExit("All fields must have the same number of values.")
+    with open_output(args.out) as fileobj:
+        write_dataset(custom_dataset(field_values), fileobj, output_format(args))
+
+
+def cmd_trim(args):
+    fields = args.fields or peek_columns(args.input)
+    # Relative paths of other sources are taken from the app folder, the input file is taken from here
+    write_output(args, "trim", {"source": os.path.abspath(args.input), "fields": fields, "num_rows": args.rows,
+                                "chunk_rows": args.chunk_rows, "where": args.where})
+
+
+def cmd_replay(args):
+    manifest = load_manifest(args.manifest)
+    files = {}
+    for item in args.source or []:
+        name, _, path = item.partition("=")
+        files[name] = os.path.abspath(path)
+    problems = check_manifest(manifest, files)
+    if problems:
+        raise SystemExit("Cannot replay the manifest: " + " ".join(problems))
+    for warning in library_warnings(manifest):
+        print(f"warning: {warning}, the output may differ", file=sys.stderr)
+    with open_output(args.out) as fileobj:
+        replay_to_file(manifest, fileobj, output_format(args), files, args.workers)
+
+
+def cmd_build_sidecars(args):
+    for built in build_sidecars():
+        print(built)
+
+
+def cmd_build_index(args):
+    index = build_index(args.datasets)
+    for name in args.datasets or DATASET_PATHS:
+        info = index["datasets"][name]
+        print(f"{name}: {info['rows']} rows x {len(info['columns'])} columns, {info['bytes']} bytes")
+    print(f"Index written to {INDEX_PATH}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="datagen", description="Generate datasets from the command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sub = commands.add_parser("list", help="list the bundled datasets")
+    sub.set_defaults(func=cmd_list)
+
+    sub = commands.add_parser("columns", help="list the columns of a dataset")
+    sub.add_argument("--source", required=True, help="bundled dataset name or CSV path")
+    sub.set_defaults(func=cmd_columns)
+
+    sub = commands.add_parser("sample", help="randomly sample rows (with replacement) from a dataset")
+    sub.add_argument("--source", required=True, help="bundled dataset name or CSV path")
+    sub.add_argument("--fields", nargs="+", help="columns to keep (default: all)")
+    sub.add_argument("--rows", type=int, required=True, help="number of rows to generate")
+    sub.add_argument("--where", help="only sample rows matching this pandas query, e.g. \"Outcome == 1\"")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows generated per chunk")
+    sub.add_argument("--workers", type=int, default=1, help="worker processes (0 for one per CPU), the output does not depend on it")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_sample)
+
+    sub = commands.add_parser("synth", help="synthesize new rows from distributions fitted on a dataset")
+    source = sub.add_mutually_exclusive_group(required=True)
+    source.add_argument("--source", help="bundled dataset name or CSV path to fit the model on")
+    source.add_argument("--model", help="previously saved model (JSON) to sample from")
+    sub.add_argument("--fields", nargs="+", help="columns to fit (default: all)")
+    sub.add_argument("--independent", action="store_true", help="do not model the correlation between columns")
+    sub.add_argument("--save-model", help="save the fitted model as JSON")
+    sub.add_argument("--rows", type=int, help="number of rows to generate")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows generated per chunk")
+    sub.add_argument("--workers", type=int, default=1, help="worker processes (0 for one per CPU), the output does not depend on it")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_synth)
+
+    sub = commands.add_parser("regression", help="generate features and a target with known coefficients")
+    source = sub.add_mutually_exclusive_group(required=True)
+    source.add_argument("--source", choices=sorted(TARGET_COLUMNS), help="Regression dataset to fit the model on")
+    source.add_argument("--model", help="previously saved ground truth (JSON) to generate from")
+    source.add_argument("--features", type=int, help="number of independent standard normal features")
+    sub.add_argument("--fields", nargs="+", help="feature columns of --source (default: all numeric)")
+    sub.add_argument("--coefficients", type=float, nargs="+", help="true coefficients, one per feature")
+    sub.add_argument("--intercept", type=float, help="true intercept")
+    sub.add_argument("--noise", type=float, help="standard deviation of the noise")
+    sub.add_argument("--nonlinearity", choices=list(NONLINEARITIES), help="function applied to the linear predictor")
+    sub.add_argument("--rows", type=int, required=True, help="number of rows to generate")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows generated per chunk")
+    sub.add_argument("--workers", type=int, default=1, help="worker processes (0 for one per CPU), the output does not depend on it")
+    sub.add_argument("--truth", help="where to save the ground truth (default: next to --out)")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_regression)
+
+    sub = commands.add_parser("stratify", help="sample rows of a Classification dataset with exact class proportions")
+    sub.add_argument("--source", required=True, choices=sorted(LABEL_COLUMNS), help="Classification dataset")
+    sub.add_argument("--fields", nargs="+", help="columns to keep besides the label (default: all)")
+    sub.add_argument("--rows", type=int, required=True, help="number of rows to generate")
+    sub.add_argument("--proportions", default="original", metavar="original|balanced|CLASS=W,...",
+                     help="class proportions (default: as in the dataset)")
+    sub.add_argument("--smote", action="store_true", help="interpolate rows of classes with fewer rows than requested")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows generated per chunk")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_stratify)
+
+    sub = commands.add_parser("baskets", help="sample whole transactions of an Association dataset, or synthesize new ones")
+    sub.add_argument("--source", required=True, choices=sorted(BASKET_LAYOUTS), help="Association dataset")
+    sub.add_argument("--transactions", type=int, required=True, help="number of transactions to generate")
+    sub.add_argument("--synthetic", action="store_true", help="generate new baskets from item frequencies and co-occurrences")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=1_000_000, help="transactions generated per chunk")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_baskets)
+
+    sub = commands.add_parser("timeseries", help="generate a stream of timestamped transactions of an Association dataset")
+    sub.add_argument("--source", required=True, choices=sorted(TIME_LAYOUTS), help="Association dataset with timestamps")
+    sub.add_argument("--days", type=int, required=True, help="number of days to generate")
+    sub.add_argument("--start", help="first day, YYYY-MM-DD (default: the day after the dataset ends)")
+    sub.add_argument("--scale", type=float, default=1.0, help="multiplier of the learned arrival rates")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-days", type=int, default=7, help="days generated per chunk")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_timeseries)
+
+    sub = commands.add_parser("clusters", help="generate labeled points around the clusters of a Clustering dataset")
+    sub.add_argument("--source", required=True, help="bundled dataset name or CSV path with a 'Cluster' column")
+    sub.add_argument("--fields", nargs="+", help="feature columns to generate (default: all)")
+    sub.add_argument("--rows", type=int, required=True, help="number of points to generate")
+    sub.add_argument("--clusters", type=int, help="number of clusters (default: as in the dataset)")
+    sub.add_argument("--separation", type=float, default=1.0, help="scale of the distance between cluster centroids")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=1_000_000, help="points generated per chunk")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_clusters)
+
+    sub = commands.add_parser("entire", help="export an entire bundled dataset")
+    sub.add_argument("--source", required=True, help="bundled dataset name or CSV path")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_entire)
+
+    sub = commands.add_parser("custom", help="generate a dataset from field rules or assemble it from field values")
+    sub.add_argument("--spec", help="JSON file with a list of field rules (see spec.py)")
+    sub.add_argument("--rows", type=int, default=100, help="number of rows to generate from --spec")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--field", action="append", metavar="NAME=V1,V2,...",
+                     help="field name and its comma separated values (repeatable)")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_custom)
+
+    sub = commands.add_parser("trim", help="keep selected fields and a uniform random sample of rows of a CSV file")
+    sub.add_argument("--input", required=True, help="CSV file to trim, read in chunks")
+    sub.add_argument("--fields", nargs="+", help="columns to keep (default: all)")
+    sub.add_argument("--rows", type=int, required=True, help="number of rows to keep")
+    sub.add_argument("--where", help="only keep rows matching this pandas query, e.g. \"median_income > 5\"")
+    sub.add_argument("--seed", type=int, help="random seed for reproducible output")
+    sub.add_argument("--chunk-rows", type=int, default=100_000, help="rows parsed per chunk")
+    sub.add_argument("--manifest", help="save a replay manifest (JSON) of the output")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_trim)
+
+    sub = commands.add_parser("replay", help="regenerate the output described by a replay manifest")
+    sub.add_argument("--manifest", required=True, help="replay manifest (JSON) saved by the app or --manifest")
+    sub.add_argument("--source", action="append", metavar="NAME=PATH",
+                     help="read a source of the manifest from another path, e.g. an uploaded file (repeatable)")
+    sub.add_argument("--workers", type=int, default=1, help="worker processes (0 for one per CPU), the output does not depend on it")
+    sub.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    sub.add_argument("--format", choices=list(EXPORT_FORMATS), help="output format (default: from the --out extension, else csv)")
+    sub.set_defaults(func=cmd_replay)
+
+    sub = commands.add_parser("build-sidecars", help="build the columnar sidecars of the bundled datasets")
+    sub.set_defaults(func=cmd_build_sidecars)
+
+    sub = commands.add_parser("build-index", help="build the metadata index of the bundled datasets used by the app")
+    sub.add_argument("--datasets", nargs="+", choices=list(DATASET_PATHS), help="datasets to describe again (default: all)")
+    sub.set_defaults(func=cmd_build_index)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
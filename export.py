@@ -0,0 +1,175 @@
+"""Export helpers: turn generated datasets into downloadable files chunk by chunk.
+
+Every format in EXPORT_FORMATS has a writer taking an iterable of DataFrame
+chunks and a binary file object, so generated data is encoded one chunk at a
+time and the whole file never has to be built in memory. More formats can be
+added with register_format().
+"""
+import gzip
+import io
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from instrumentation import stage
+
+# Rows encoded per chunk when writing CSV
+CHUNK_ROWS = 50_000
+
+# Compression of the columnar formats
+PARQUET_COMPRESSION = "zstd"
+FEATHER_COMPRESSION = "zstd"
+
+# Exports larger than this spill from memory to a temporary file on disk
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+def iter_csv_chunks(df, chunk_rows=CHUNK_ROWS, header=True):
+    """Yield the CSV encoding of a DataFrame as UTF-8 bytes, a block of rows at a time."""
+    if header:
+        yield df.iloc[:0].to_csv(index=False).encode()
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode()
+
+
+def write_csv_chunks(chunks, fileobj, chunk_rows=CHUNK_ROWS):
+    """Write a sequence of DataFrame chunks as one CSV file, with the header written once."""
+    for i, chunk in enumerate(chunks):
+        for block in iter_csv_chunks(chunk, chunk_rows, header=(i == 0)):
+            fileobj.write(block)
+    return fileobj
+
+
+class _KeepOpen(io.RawIOBase):
+    """Writable view of a file object that stays open when an Arrow stream on top of it is closed."""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self._fileobj.write(data)
+
+    def close(self):
+        self._fileobj.flush()
+        super().close()
+
+
+def write_gzip_csv_chunks(chunks, fileobj):
+    # No file name nor timestamp in the header, so the same rows always give the same bytes
+    with gzip.GzipFile(filename="", fileobj=fileobj, mode="wb", compresslevel=6, mtime=0) as stream:
+        write_csv_chunks(chunks, stream)
+    return fileobj
+
+
+def write_zstd_csv_chunks(chunks, fileobj):
+    stream = pa.CompressedOutputStream(pa.PythonFile(_KeepOpen(fileobj), mode="w"), "zstd")
+    try:
+        write_csv_chunks(chunks, stream)
+    finally:
+        stream.close()
+    return fileobj
+
+
+def _iter_tables(chunks):
+    """Convert DataFrame chunks to Arrow tables that all share the schema of the first one."""
+    schema = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if schema is None:
+            schema = table.schema
+        elif not table.schema.equals(schema):
+            table = table.cast(schema)
+        yield table
+
+
+def write_parquet_chunks(chunks, fileobj):
+    """Write the chunks as the row groups of one Parquet file."""
+    writer = None
+    for table in _iter_tables(chunks):
+        if writer is None:
+            writer = pq.ParquetWriter(fileobj, table.schema, compression=PARQUET_COMPRESSION)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+    return fileobj
+
+
+def write_feather_chunks(chunks, fileobj):
+    """Write the chunks as the record batches of one Feather (Arrow IPC) file."""
+    writer = None
+    for table in _iter_tables(chunks):
+        if writer is None:
+            options = pa.ipc.IpcWriteOptions(compression=FEATHER_COMPRESSION)
+            writer = pa.ipc.new_file(fileobj, table.schema, options=options)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+    return fileobj
+
+
+def write_jsonl_chunks(chunks, fileobj):
+    """Write the chunks as JSON Lines, one object per row."""
+    for chunk in chunks:
+        if len(chunk):
+            fileobj.write(chunk.to_json(orient="records", lines=True, date_format="iso").encode())
+    return fileobj
+
+
+# Export formats by name: label shown in the app, file extension, MIME type and chunk writer
+EXPORT_FORMATS = {}
+
+
+def register_format(name, label, extension, mime, writer):
+    """Add an export format; writer(chunks, fileobj) writes an iterable of DataFrames to a binary file."""
+    EXPORT_FORMATS[name] = {"label": label, "extension": extension, "mime": mime, "writer": writer}
+
+
+register_format("csv", "CSV", ".csv", "text/csv", write_csv_chunks)
+register_format("csv.gz", "CSV (gzip)", ".csv.gz", "application/gzip", write_gzip_csv_chunks)
+register_format("csv.zst", "CSV (zstd)", ".csv.zst", "application/zstd", write_zstd_csv_chunks)
+register_format("parquet", "Parquet", ".parquet", "application/vnd.apache.parquet", write_parquet_chunks)
+register_format("feather", "Feather (Arrow IPC)", ".feather", "application/vnd.apache.arrow.file", write_feather_chunks)
+register_format("jsonl", "JSON Lines", ".jsonl", "application/jsonl", write_jsonl_chunks)
+
+
+def format_from_path(path, default="csv"):
+    """Guess the export format from a file name, e.g. 'out.csv.gz' -> 'csv.gz'."""
+    name = str(path).lower()
+    matches = [fmt for fmt, spec in EXPORT_FORMATS.items() if name.endswith(spec["extension"])]
+    return max(matches, key=lambda fmt: len(EXPORT_FORMATS[fmt]["extension"])) if matches else default
+
+
+def iter_frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Split a DataFrame into row blocks, without copying it."""
+    if len(df) == 0:
+        yield df
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_chunks(chunks, fileobj, fmt="csv"):
+    """Write a sequence of DataFrame chunks as one file of the given export format."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}.")
+    return EXPORT_FORMATS[fmt]["writer"](chunks, fileobj)
+
+
+def write_dataset(df, fileobj, fmt="csv", chunk_rows=CHUNK_ROWS):
+    """Write a DataFrame in the given export format, a block of rows at a time."""
+    return write_chunks(iter_frame_chunks(df, chunk_rows), fileobj, fmt)
+
+
+def export_buffer(df, fmt="csv", chunk_rows=CHUNK_ROWS):
+    """Return a rewound binary file object holding the export of a DataFrame in the given format.
+
+    Small exports stay in memory, large ones are spooled to a temporary file.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with stage("encode", format=fmt, rows=len(df)):
+        write_dataset(df, buffer, fmt, chunk_rows)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,157 @@
+"""Row filters: pandas query expressions evaluated before sampling, e.g. "ocean_proximity == 'NEAR BAY' and median_income > 5".
+
+Expressions are evaluated with DataFrame.eval (vectorized, with numexpr when it
+is installed). For a bundled dataset only the columns the expression names are
+read to compute its boolean mask, which is cached per dataset version and
+expression, so the same filter is free the second time; only the matching rows
+of the selected fields are then loaded. CSV files that are streamed (the
+Trimmer) are filtered chunk by chunk instead.
+
+Only column names, literals, comparisons (including in / not in), boolean and
+arithmetic operators are accepted; local variables (@name), attribute access,
+function calls and anything else DataFrame.eval would run are rejected before
+it is called.
+"""
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+
+from catalog import cached, dataset_columns, dataset_key, load_columns
+from instrumentation import stage
+
+# Column names in an expression: plain identifiers or `quoted names with spaces`
+_NAME = re.compile(r"`([^`]+)`|[A-Za-z_][A-Za-z0-9_]*")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_QUOTED_OR_STRING = re.compile(_STRING.pattern + r"|`([^`]+)`")
+
+# Syntax allowed in a filter, everything else is rejected by check_expression()
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd, ast.Invert,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.BitAnd, ast.BitOr,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+)
+
+# Operators whose result can grow without bound on literals (9**9**9, 'a' * 10**9); Python would compute them
+# while holding the interpreter lock, so they need a column on one side
+_GROWING_OPERATORS = (ast.Pow, ast.Mult)
+
+
+def filter_columns(expression, columns):
+    """Return the columns, among the given ones, that an expression refers to."""
+    names = set()
+    for match in _NAME.finditer(_STRING.sub("", expression)):
+        names.add(match.group(1) or match.group(0))
+    return [column for column in columns if column in names]
+
+
+def check_expression(expression, columns):
+    """Raise ValueError unless an expression only uses the given columns, literals and the allowed operators."""
+    quoted = {}
+
+    def replace(match):
+        if match.group(1) is None:
+            return match.group(0)
+        # Quoted names become identifiers the Python parser accepts
+        placeholder = f"_quoted_column_{len(quoted)}"
+        quoted[placeholder] = match.group(1)
+        return placeholder
+
+    if "@" in _QUOTED_OR_STRING.sub("", expression):
+        raise ValueError(f"Invalid filter '{expression}': local variables (@name) are not allowed.")
+    try:
+        tree = ast.parse(_QUOTED_OR_STRING.sub(replace, expression).strip(), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Invalid filter '{expression}': it is not a valid expression.") from None
+    columns = set(columns)
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Invalid filter '{expression}': {type(node).__name__} is not allowed, "
+                             "use column names, literals and operators only.")
+        if isinstance(node, ast.BinOp) and isinstance(node.op, _GROWING_OPERATORS) and not any(
+                isinstance(child, ast.Name) for operand in (node.left, node.right) for child in ast.walk(operand)):
+            raise ValueError(f"Invalid filter '{expression}': {'**' if isinstance(node.op, ast.Pow) else '*'} "
+                             "needs a column on one side, compute literal values beforehand.")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (str, int, float, bool)):
+            raise ValueError(f"Invalid filter '{expression}': the literal {node.value!r} is not allowed.")
+        if isinstance(node, ast.Name):
+            if node.id.startswith("__"):
+                raise ValueError(f"Invalid filter '{expression}': names starting with __ are not allowed.")
+            name = quoted.get(node.id, node.id)
+            if name not in columns:
+                raise ValueError(f"Invalid filter '{expression}': unknown column '{name}'.")
+
+
+def _widen(df):
+    """Return df with its integer columns as int64 and float columns as float64.
+
+    The catalog stores integers in the smallest width holding their range, so
+    arithmetic in a filter (e.g. age * 3 on int8) would silently overflow.
+    """
+    dtypes = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, np.dtype):
+            if dtype.kind in "iu" and dtype != np.int64 and not (dtype.kind == "u" and dtype.itemsize == 8):
+                dtypes[column] = np.int64
+            elif dtype.kind == "f" and dtype != np.float64:
+                dtypes[column] = np.float64
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[column] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[column] = "Float64"
+    return df.astype(dtypes) if dtypes else df
+
+
+def evaluate(df, expression):
+    """Evaluate a filter expression on a DataFrame and return its boolean mask as a NumPy array."""
+    check_expression(expression, df.columns)
+    try:
+        result = _widen(df).eval(expression)
+    except Exception as error:
+        raise ValueError(f"Invalid filter '{expression}': {error}") from None
+    if not isinstance(result, pd.Series) or not pd.api.types.is_bool_dtype(result):
+        raise ValueError(f"The filter '{expression}' must be a condition, e.g. Outcome == 1.")
+    return result.fillna(False).to_numpy(dtype=bool)
+
+
+def _build_mask(source, expression):
+    df = load_columns(source, filter_columns(expression, dataset_columns(source)))
+    with stage("filter", rows=len(df)):
+        return evaluate(df, expression)
+
+
+def dataset_mask(source, expression):
+    """Return the boolean mask of a bundled dataset's rows matching expression, cached per file version.
+
+    Only the columns named in the expression are read.
+    """
+    return cached("filter", (dataset_key(source), expression), lambda: _build_mask(source, expression))
+
+
+def matching_rows(source, expression):
+    """Return the positions of a bundled dataset's rows matching expression; an error if there are none."""
+    rows = np.flatnonzero(dataset_mask(source, expression))
+    if not len(rows):
+        raise ValueError(f"No rows match the filter '{expression}'.")
+    return rows
+
+
+def load_filtered(source, fields, expression=None):
+    """Load the selected fields of the rows of a bundled dataset matching expression (all rows if None)."""
+    if not expression:
+        return load_columns(source, fields)
+    return load_columns(source, fields, rows=matching_rows(source, expression))
+
+
+def filter_chunks(chunks, expression, fields):
+    """Keep the rows of each chunk matching expression, then the selected fields.
+
+    The chunks must include the columns named in the expression, see filter_columns().
+    """
+    for chunk in chunks:
+        with stage("filter", rows=len(chunk)):
+            chunk = chunk[evaluate(chunk, expression)]
+        yield chunk[list(fields)]
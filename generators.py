@@ -0,0 +1,83 @@
+"""Dataset generators shared by the Streamlit pages and the datagen command line."""
+import numpy as np
+import pandas as pd
+
+from baskets import load_basket_model, load_baskets, sample_transactions, synthesize_baskets, to_frame
+from catalog import load_dataset
+from clusters import cluster_layout, get_cluster_model, sample_layout
+from filters import load_filtered
+from regression import sample_regression
+from sampling import sample_rows
+from stratify import allocate_rows, class_weights, get_class_index, stratified_sample
+from synth import get_model, sample_model
+from timeseries import iter_time_series_chunks
+
+
+def sample_dataset(source, fields, num_rows, seed=None, where=None):
+    """Randomly sample num_rows rows of the selected fields from a bundled dataset.
+
+    where is an optional filter expression (see filters.py); only matching rows are sampled.
+    """
+    return sample_rows(load_filtered(source, fields, where), num_rows, seed=seed)
+
+
+def sample_chunk(source, fields, where, size, rng):
+    """Generate one chunk of sample_dataset(), used by the scheduler on each worker."""
+    return sample_rows(load_filtered(source, fields, where), size, rng=rng)
+
+
+def synthesize_dataset(source, fields, num_rows, seed=None, correlated=True):
+    """Generate num_rows new rows from distributions fitted on the selected fields of a dataset."""
+    return sample_model(get_model(source, fields, correlated), num_rows, seed=seed)
+
+
+def synthesize_chunk(model, size, rng):
+    """Generate one chunk of synthesized rows, used by the scheduler on each worker."""
+    return sample_model(model, size, rng=rng)
+
+
+def regression_dataset(model, num_rows, seed=None):
+    """Generate features and target from a regression model with a known target function."""
+    return sample_regression(model, num_rows, seed=seed)
+
+
+def regression_chunk(model, size, rng):
+    """Generate one chunk of regression rows, used by the scheduler on each worker."""
+    return sample_regression(model, size, rng=rng)
+
+
+def stratified_dataset(source, fields, num_rows, proportions="original", smote=False, seed=None):
+    """Sample rows of a Classification dataset with exact class proportions ('original', 'balanced' or weights)."""
+    counts = allocate_rows(class_weights(get_class_index(source), proportions), num_rows)
+    return stratified_sample(source, fields, counts, smote, seed=seed)
+
+
+def basket_dataset(source, num_transactions, synthetic=False, seed=None):
+    """Sample whole transactions of an Association dataset, or synthesize new ones, in its own layout."""
+    if synthetic:
+        generated = synthesize_baskets(load_basket_model(source), num_transactions, seed=seed)
+    else:
+        generated = sample_transactions(load_baskets(source), num_transactions, seed=seed)
+    return to_frame(source, generated)
+
+
+def time_series_dataset(source, num_days, start=None, scale=1.0, seed=None):
+    """Generate a stream of timestamped transactions of an Association dataset with timestamps, in one piece."""
+    return next(iter_time_series_chunks(source, num_days, start, scale, seed, chunk_days=num_days))
+
+
+def cluster_dataset(source, fields, num_points, num_clusters=None, separation=1.0, seed=None):
+    """Generate labeled points around the fitted clusters of a Clustering dataset."""
+    rng = np.random.default_rng(seed)
+    layout = cluster_layout(get_cluster_model(source, fields), num_clusters, separation, rng=rng)
+    return sample_layout(layout, num_points, rng=rng)
+
+
+def entire_dataset(source):
+    """Return a bundled dataset as is."""
+    return load_dataset(source)
+
+
+def custom_dataset(field_values):
+    """Assemble a dataset from a mapping of field name -> list of values."""
+    return pd.DataFrame({field_name: list(values) for field_name, values in field_values.items()})
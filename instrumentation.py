@@ -0,0 +1,140 @@
+"""Timers and memory counters around the hot paths: load, project, filter, sample, profile, encode and render.
+
+Each stage() records its duration and the growth of the process peak memory
+(RSS) into three places:
+
+- the records of the current run (one Streamlit script run, or any code
+  between start_run() calls), shown in the app's debug panel,
+- process-wide counters, exported in the Prometheus text format by
+  metrics_text() and written to DATAGEN_METRICS_FILE for a textfile collector,
+- one JSON log line per stage on the "datagen.stages" logger (DEBUG level).
+
+The timers cost a few microseconds per stage, so they are always on.
+cProfile dumps are only recorded when asked for, see start_profile().
+"""
+import contextlib
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ["load", "project", "filter", "sample", "profile", "encode", "render"]
+
+# Set DATAGEN_DEBUG=1 to show the debug panel on every page (it also opens with ?debug=1)
+DEBUG = os.environ.get("DATAGEN_DEBUG") == "1"
+
+# Prometheus textfile the counters are written to after every run, if set
+METRICS_FILE = os.environ.get("DATAGEN_METRICS_FILE")
+
+# Folder of the cProfile dumps
+PROFILE_DIR = os.environ.get("DATAGEN_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "datagen-profiles"))
+
+logger = logging.getLogger("datagen.stages")
+
+_records = contextvars.ContextVar("stage_records", default=None)
+_counters = {}
+_lock = threading.Lock()
+
+
+def _peak_rss():
+    """Return the peak resident memory of the process in bytes, or 0 where it is not available."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def start_run():
+    """Start collecting the stages of a new run in this thread, return its (empty) list of records."""
+    records = []
+    _records.set(records)
+    return records
+
+
+def run_records():
+    """Return the stage records of the current run, oldest first."""
+    return _records.get() or []
+
+
+@contextlib.contextmanager
+def stage(name, **labels):
+    """Time a block of code as one stage; labels (e.g. rows=...) are kept with the record."""
+    peak = _peak_rss()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        record = dict(labels, stage=name, seconds=seconds, memory_growth_bytes=_peak_rss() - peak)
+        records = _records.get()
+        if records is not None:
+            records.append(record)
+        with _lock:
+            counter = _counters.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "memory_growth_bytes": 0})
+            counter["calls"] += 1
+            counter["seconds"] += seconds
+            counter["max_seconds"] = max(counter["max_seconds"], seconds)
+            counter["memory_growth_bytes"] += record["memory_growth_bytes"]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(record, default=str))
+
+
+def counters():
+    """Return a copy of the process-wide counters by stage."""
+    with _lock:
+        return {name: dict(counter) for name, counter in _counters.items()}
+
+
+def metrics_text():
+    """Return the counters in the Prometheus text exposition format."""
+    current = counters()
+    metrics = [
+        ("datagen_stage_calls_total", "counter", "Stages run.", "calls"),
+        ("datagen_stage_seconds_total", "counter", "Time spent in stages.", "seconds"),
+        ("datagen_stage_max_seconds", "gauge", "Slowest run of a stage.", "max_seconds"),
+        ("datagen_stage_memory_growth_bytes_total", "counter", "Growth of the peak RSS during stages.", "memory_growth_bytes"),
+    ]
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, counter in current.items():
+            lines.append(f'{metric}{{stage="{name}"}} {counter[field]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path=METRICS_FILE):
+    """Write metrics_text() to path atomically, so a collector never reads half a file."""
+    if not path:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fileobj:
+        fileobj.write(metrics_text())
+    os.replace(tmp_path, path)
+
+
+def start_profile():
+    """Start a cProfile profiler for the current thread."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profile(profiler, name):
+    """Stop a profiler and dump its statistics to PROFILE_DIR/name.prof (readable with pstats or snakeviz)."""
+    profiler.disable()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{name}.prof")
+    profiler.dump_stats(path)
+    return path
@@ -0,0 +1,246 @@
+"""Replay manifests: a few kilobytes of JSON from which a generated dataset can be rebuilt exactly.
+
+A manifest records the generator, its parameters, the seed, the SHA-256 of
+every source file and the rows per block the output was exported in. Every
+generation of the app and the command line goes through generate_chunks(), so
+replaying a manifest with the same library versions gives the same rows; the
+replayed file is written in the same blocks (Parquet row groups, Feather record
+batches), so it also has the same bytes.
+
+    {"version": 1, "generator": "sample", "seed": 1234,
+     "params": {"source": "house_price", "fields": ["median_income"], "num_rows": 500},
+     "sources": {"house_price": "sha256:..."}, "export_rows": 50000,
+     "libraries": {"numpy": "...", "pandas": "..."}}
+
+Parameters with "chunk_rows" ("chunk_days" for time series) are generated in
+chunks of that size (the command line), without it in one piece (the app); the
+two give different rows.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from baskets import iter_basket_chunks
+from catalog import file_hash
+from clusters import get_cluster_model, iter_cluster_chunks
+from export import CHUNK_ROWS as EXPORT_ROWS, iter_frame_chunks, write_chunks
+from generators import (basket_dataset, cluster_dataset, custom_dataset, regression_chunk, regression_dataset,
+                        sample_chunk, sample_dataset, stratified_dataset, synthesize_chunk, synthesize_dataset,
+                        time_series_dataset)
+from scheduler import iter_chunks, write_parallel
+from spec import generate_from_spec
+from stratify import iter_stratified_chunks
+from synth import get_model
+from timeseries import iter_time_series_chunks
+from trimmer import CHUNK_ROWS as TRIM_CHUNK_ROWS, trim_file
+
+MANIFEST_VERSION = 1
+
+
+def _synth_model(params):
+    if "model" in params:
+        return params["model"]
+    return get_model(params["source"], params["fields"], params.get("correlated", True))
+
+
+def _sample(params, seed, workers):
+    if params.get("chunk_rows"):
+        return iter_chunks(sample_chunk, (params["source"], params["fields"], params.get("where")), params["num_rows"],
+                           seed, params["chunk_rows"], workers)
+    return [sample_dataset(params["source"], params["fields"], params["num_rows"], seed, params.get("where"))]
+
+
+def _synthesize(params, seed, workers):
+    if params.get("chunk_rows"):
+        return iter_chunks(synthesize_chunk, (_synth_model(params),), params["num_rows"], seed,
+                           params["chunk_rows"], workers)
+    if "model" in params:
+        return [synthesize_chunk(params["model"], params["num_rows"], np.random.default_rng(seed))]
+    return [synthesize_dataset(params["source"], params["fields"], params["num_rows"], seed, params.get("correlated", True))]
+
+
+def _regression(params, seed, workers):
+    if params.get("chunk_rows"):
+        return iter_chunks(regression_chunk, (params["model"],), params["num_rows"], seed, params["chunk_rows"], workers)
+    return [regression_dataset(params["model"], params["num_rows"], seed)]
+
+
+def _stratified(params, seed, workers):
+    if params.get("chunk_rows"):
+        return iter_stratified_chunks(params["source"], params["fields"], params["num_rows"], params["proportions"],
+                                      params.get("smote", False), seed, params["chunk_rows"])
+    return [stratified_dataset(params["source"], params["fields"], params["num_rows"], params["proportions"],
+                               params.get("smote", False), seed)]
+
+
+def _clusters(params, seed, workers):
+    if params.get("chunk_rows"):
+        model = get_cluster_model(params["source"], params["fields"])
+        return iter_cluster_chunks(model, params["num_rows"], params.get("num_clusters"),
+                                   params.get("separation", 1.0), seed, params["chunk_rows"])
+    return [cluster_dataset(params["source"], params["fields"], params["num_rows"], params.get("num_clusters"),
+                            params.get("separation", 1.0), seed)]
+
+
+def _baskets(params, seed, workers):
+    if params.get("chunk_rows"):
+        return iter_basket_chunks(params["source"], params["num_rows"], params.get("synthetic", False), seed,
+                                  params["chunk_rows"])
+    return [basket_dataset(params["source"], params["num_rows"], params.get("synthetic", False), seed)]
+
+
+def _time_series(params, seed, workers):
+    if params.get("chunk_days"):
+        return iter_time_series_chunks(params["source"], params["num_days"], params.get("start"), params.get("scale", 1.0),
+                                       seed, params["chunk_days"])
+    return [time_series_dataset(params["source"], params["num_days"], params.get("start"), params.get("scale", 1.0), seed)]
+
+
+def _spec(params, seed, workers):
+    return [generate_from_spec(params["spec"], params["num_rows"], seed)]
+
+
+def _values(params, seed, workers):
+    return [custom_dataset(params["values"])]
+
+
+def _trim(params, seed, workers):
+    chunk_rows = params.get("chunk_rows") or TRIM_CHUNK_ROWS
+    return [trim_file(params["source"], params["fields"], params["num_rows"], seed, chunk_rows, params.get("where"))]
+
+
+# Generators that can be replayed, with the parameters naming source files
+GENERATORS = {
+    "sample": {"generate": _sample, "sources": ["source"]},
+    "synthesize": {"generate": _synthesize, "sources": ["source"]},
+    "regression": {"generate": _regression, "sources": ["source"]},
+    "stratified": {"generate": _stratified, "sources": ["source"]},
+    "clusters": {"generate": _clusters, "sources": ["source"]},
+    "baskets": {"generate": _baskets, "sources": ["source"]},
+    "timeseries": {"generate": _time_series, "sources": ["source"]},
+    "spec": {"generate": _spec, "sources": []},
+    "values": {"generate": _values, "sources": []},
+    "trim": {"generate": _trim, "sources": ["source"]},
+}
+
+# Generators whose plain CSV output is encoded on the worker processes, see scheduler.write_parallel()
+_PARALLEL_CSV = {
+    "sample": lambda params: (sample_chunk, (params["source"], params["fields"], params.get("where"))),
+    "synthesize": lambda params: (synthesize_chunk, (_synth_model(params),)),
+    "regression": lambda params: (regression_chunk, (params["model"],)),
+}
+
+
+def _resolve(params, generator, files):
+    """Replace the source names that have an open file in files (e.g. uploads) by that file."""
+    if not files:
+        return params
+    params = dict(params)
+    for name in GENERATORS[generator]["sources"]:
+        if params.get(name) in files:
+            params[name] = files[params[name]]
+    return params
+
+
+def generate_chunks(generator, params, seed, files=None, workers=1):
+    """Run a generator and return its output as an iterable of DataFrame chunks."""
+    if generator not in GENERATORS:
+        raise ValueError(f"Unknown generator '{generator}', expected one of: {', '.join(GENERATORS)}.")
+    return GENERATORS[generator]["generate"](_resolve(params, generator, files), seed, workers)
+
+
+def generate_dataset(generator, params, seed, files=None, workers=1):
+    """Run a generator and return its output as one DataFrame."""
+    chunks = list(generate_chunks(generator, params, seed, files, workers))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_generated(generator, params, seed, fileobj, fmt="csv", files=None, workers=1, export_rows=EXPORT_ROWS):
+    """Run a generator and write its output to fileobj chunk by chunk.
+
+    Chunks are exported in blocks of at most export_rows rows, like export.export_buffer() does in the app.
+    """
+    if fmt == "csv" and params.get("chunk_rows") and generator in _PARALLEL_CSV:
+        chunk_fn, args = _PARALLEL_CSV[generator](params)
+        return write_parallel(chunk_fn, args, params["num_rows"], fileobj, seed, params["chunk_rows"], workers)
+    chunks = generate_chunks(generator, params, seed, files, workers)
+    blocks = (block for chunk in chunks for block in iter_frame_chunks(chunk, export_rows))
+    return write_chunks(blocks, fileobj, fmt)
+
+
+def make_manifest(generator, params, seed, files=None):
+    """Describe a generation: generator, parameters, seed, source hashes and library versions."""
+    resolved = _resolve(params, generator, files)
+    sources = {}
+    for name in GENERATORS[generator]["sources"]:
+        if params.get(name) is not None:
+            sources[params[name]] = file_hash(resolved[name])
+    return {
+        "version": MANIFEST_VERSION,
+        "generator": generator,
+        "params": params,
+        "seed": seed,
+        "sources": sources,
+        "export_rows": EXPORT_ROWS,
+        "libraries": {"numpy": np.__version__, "pandas": pd.__version__},
+    }
+
+
+def check_manifest(manifest, files=None):
+    """Return the problems that would stop a replay from giving the same output, an empty list if none."""
+    problems = []
+    if manifest.get("version") != MANIFEST_VERSION:
+        problems.append(f"Unsupported manifest version {manifest.get('version')}.")
+    if manifest.get("generator") not in GENERATORS:
+        problems.append(f"Unknown generator '{manifest.get('generator')}'.")
+    for name, expected in manifest.get("sources", {}).items():
+        source = (files or {}).get(name, name)
+        try:
+            actual = file_hash(source)
+        except OSError:
+            problems.append(f"Source '{name}' is missing.")
+            continue
+        if actual != expected:
+            problems.append(f"Source '{name}' has changed since the manifest was made.")
+    return problems
+
+
+def library_warnings(manifest):
+    """Return the libraries whose version differs from the one the manifest was made with."""
+    current = {"numpy": np.__version__, "pandas": pd.__version__}
+    return [f"{name} {version} (manifest: {manifest['libraries'][name]})"
+            for name, version in current.items() if manifest.get("libraries", {}).get(name) not in (None, version)]
+
+
+def replay_dataset(manifest, files=None, workers=1):
+    """Regenerate the DataFrame described by a manifest, after checking its sources."""
+    problems = check_manifest(manifest, files)
+    if problems:
+        raise ValueError(" ".join(problems))
+    return generate_dataset(manifest["generator"], manifest["params"], manifest["seed"], files, workers)
+
+
+def replay_to_file(manifest, fileobj, fmt="csv", files=None, workers=1):
+    """Regenerate the output described by a manifest straight into a file, chunk by chunk."""
+    problems = check_manifest(manifest, files)
+    if problems:
+        raise ValueError(" ".join(problems))
+    return write_generated(manifest["generator"], manifest["params"], manifest["seed"], fileobj, fmt, files, workers,
+                           manifest.get("export_rows", EXPORT_ROWS))
+
+
+def dumps_manifest(manifest):
+    return json.dumps(manifest, indent=1)
+
+
+def save_manifest(manifest, path):
+    with open(path, "w") as fileobj:
+        fileobj.write(dumps_manifest(manifest))
+
+
+def load_manifest(path):
+    with open(path) as fileobj:
+        return json.load(fileobj)
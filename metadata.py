@@ -0,0 +1,137 @@
+"""On-disk index of the bundled datasets: columns, dtypes, rows, bytes, label column and summary statistics.
+
+The index is one JSON file next to the app, built by `python datagen.py
+build-index` and otherwise one dataset at a time, on first use of each. An
+entry is rebuilt when the file version (mtime and size) of its dataset changes,
+so it never goes stale. The dataset pages read their field lists, shapes and
+overview header from it, and only load the data itself when rows are needed.
+"""
+import json
+import os
+import threading
+
+import pandas as pd
+
+from catalog import BASE_DIR, DATASETS, dataset_name, file_version, load_dataset, resolve_path
+from profiling import compute_overview
+
+INDEX_PATH = os.path.join(BASE_DIR, "datasets.index.json")
+INDEX_VERSION = 1
+
+# The index as last read or written, shared by all sessions
+_index = None
+_lock = threading.Lock()
+
+
+def _table(frame):
+    """Store a summary table as {column: {statistic: value}}, NaN becoming None."""
+    if frame is None:
+        return None
+    return {str(column): {str(row): None if pd.isna(value) else value for row, value in values.items()}
+            for column, values in frame.to_dict().items()}
+
+
+def describe_dataset(name):
+    """Load a bundled dataset once and return its index entry."""
+    dataset = DATASETS[name]
+    full_path = resolve_path(dataset["path"])
+    mtime, size = file_version(full_path)
+    overview = compute_overview(load_dataset(full_path))
+    return {
+        "path": dataset["path"],
+        "version": [mtime, size],
+        "bytes": size,
+        "rows": overview["shape"][0],
+        "columns": overview["columns"],
+        "dtypes": {column: str(dtype) for column, dtype in overview["dtypes"].items()},
+        "numeric_columns": overview["numeric_columns"],
+        "label": dataset.get("label"),
+        "summary": _table(overview["summary"]),
+        "categorical_summary": _table(overview["categorical_summary"]),
+    }
+
+
+def read_index(path=INDEX_PATH):
+    """Return the index stored at path, or an empty one if it is missing, unreadable or of another version."""
+    try:
+        with open(path) as fileobj:
+            index = json.load(fileobj)
+    except (OSError, ValueError):
+        return {"version": INDEX_VERSION, "datasets": {}}
+    if index.get("version") != INDEX_VERSION:
+        return {"version": INDEX_VERSION, "datasets": {}}
+    return index
+
+
+def write_index(index, path=INDEX_PATH):
+    """Write the index atomically; a read-only install keeps it in memory only."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as fileobj:
+            json.dump(index, fileobj, indent=1)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def build_index(names=None, path=INDEX_PATH):
+    """Describe the given bundled datasets (all by default) and save them in the index, return the index."""
+    global _index
+    with _lock:
+        index = read_index(path)
+        for name in names or DATASETS:
+            index["datasets"][name] = describe_dataset(name)
+        write_index(index, path)
+        if path == INDEX_PATH:
+            _index = index
+    return index
+
+
+def _is_fresh(entry, name):
+    return entry is not None and entry["version"] == list(file_version(resolve_path(DATASETS[name]["path"])))
+
+
+def dataset_info(source):
+    """Return the index entry of a bundled dataset given its short name or path, or None for other files.
+
+    Only one stat of the dataset file is made when its entry is fresh.
+    """
+    global _index
+    name = source if source in DATASETS else dataset_name(source)
+    if name is None:
+        return None
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = read_index()
+    entry = _index["datasets"].get(name)
+    if _is_fresh(entry, name):
+        return entry
+    with _lock:
+        entry = _index["datasets"].get(name)
+        if not _is_fresh(entry, name):
+            entry = describe_dataset(name)
+            _index["datasets"][name] = entry
+            write_index(_index)
+    return entry
+
+
+def index_overview(info, df):
+    """Return an overview like profiling.compute_overview() whose statistics come from an index entry.
+
+    Only the head and tail are taken from df; the numeric values behind the
+    percentiles and histograms are read from it when first asked for.
+    """
+    summary = pd.DataFrame(info["summary"]) if info["summary"] is not None else None
+    categorical = pd.DataFrame(info["categorical_summary"]) if info["categorical_summary"] is not None else None
+    return {
+        "shape": (info["rows"], len(info["columns"])),
+        "columns": info["columns"],
+        "dtypes": pd.Series(info["dtypes"], name="dtype"),
+        "head": df.head(),
+        "tail": df.tail(),
+        "numeric_columns": info["numeric_columns"],
+        "summary": summary.astype(float) if summary is not None else None,
+        "categorical_summary": categorical,
+        "frame": df,
+    }
@@ -0,0 +1,50 @@
+"""Paginated dataset preview: sorting and filtering run in pandas, only one page of rows leaves the server."""
+import numpy as np
+import pandas as pd
+
+from catalog import cached
+from sampling import take_rows
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+def _filter_mask(series, text):
+    """Rows whose value contains text, ignoring case; numbers also match by their text."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match the categories once instead of every row
+        matches = series.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return np.asarray(matches)[series.cat.codes.to_numpy()] & (series.cat.codes.to_numpy() >= 0)
+    return series.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+
+
+def compute_order(df, sort_by=None, ascending=True, filter_column=None, filter_text=""):
+    """Return the positions of the rows to show, filtered and sorted."""
+    positions = np.arange(len(df))
+    if filter_column is not None and filter_text:
+        positions = np.flatnonzero(_filter_mask(df[filter_column], filter_text))
+    if sort_by is not None:
+        values = df[sort_by].iloc[positions].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def get_order(df, key=None, sort_by=None, ascending=True, filter_column=None, filter_text=""):
+    """Return the row order of a preview, reusing the cached one when key was seen before.
+
+    The key must change whenever the data changes, as for profiling.get_overview().
+    """
+    if key is None:
+        return compute_order(df, sort_by, ascending, filter_column, filter_text)
+    order_key = (key, sort_by, ascending, filter_column, filter_text)
+    return cached("preview", order_key, lambda: compute_order(df, sort_by, ascending, filter_column, filter_text))
+
+
+def page_count(num_rows, page_size):
+    return max(1, -(-num_rows // page_size))
+
+
+def preview_page(df, positions, page, page_size):
+    """Return the rows of one page (numbered from 1), keeping their original index."""
+    start = (page - 1) * page_size
+    return take_rows(df, positions[start:start + page_size])
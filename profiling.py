@@ -0,0 +1,116 @@
+"""Dataset overview statistics, computed once per dataset version and cached."""
+import numpy as np
+import pandas as pd
+
+from catalog import cached
+from instrumentation import stage
+
+PERCENTILES = [25, 50, 75]
+HISTOGRAM_BINS = 20
+
+
+def _numeric_columns(df):
+    return [column for column in df.columns
+            if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+
+
+def compute_overview(df):
+    """Compute the basic overview of a dataset with vectorized NumPy operations on its numeric block.
+
+    The numeric block is not kept: the overview holds a reference to df and the
+    percentiles and histograms build it again when first asked for.
+    """
+    numeric = _numeric_columns(df)
+    overview = {
+        "shape": df.shape,
+        "columns": list(df.columns),
+        "dtypes": df.dtypes.astype(str),
+        "head": df.head(),
+        "tail": df.tail(),
+        "numeric_columns": numeric,
+        "summary": None,
+        "categorical_summary": None,
+        "frame": df,
+    }
+
+    if numeric and len(df):
+        values = df[numeric].to_numpy(dtype=float, na_value=np.nan)
+        present = ~np.isnan(values)
+        count = present.sum(axis=0)
+        total = np.where(present, values, 0.0).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            centered = np.where(present, values - mean, 0.0)
+            std = np.sqrt((centered ** 2).sum(axis=0) / (count - 1))
+        overview["summary"] = pd.DataFrame(
+            {
+                "count": count,
+                "mean": mean,
+                "std": std,
+                "min": np.where(present, values, np.inf).min(axis=0),
+                "max": np.where(present, values, -np.inf).max(axis=0),
+            },
+            index=numeric,
+        ).where(lambda table: np.isfinite(table)).T
+
+    other = [column for column in df.columns if column not in numeric]
+    if other and len(df):
+        rows = {}
+        for column in other:
+            counts = df[column].value_counts()
+            rows[column] = {
+                "count": int(counts.sum()),
+                "unique": len(counts),
+                "top": str(counts.index[0]) if len(counts) else None,
+                "freq": int(counts.iloc[0]) if len(counts) else None,
+            }
+        overview["categorical_summary"] = pd.DataFrame(rows)
+
+    return overview
+
+
+def _profile(df):
+    with stage("profile", rows=len(df)):
+        return compute_overview(df)
+
+
+def get_overview(df, key=None):
+    """Return the overview of a dataset, reusing the cached one when key was seen before.
+
+    The key must change whenever the data changes, e.g. (path, file version) for
+    a bundled dataset or the generation parameters of a sample.
+    """
+    if key is None:
+        return _profile(df)
+    return cached("overview", key, lambda: _profile(df))
+
+
+def _numeric_values(overview):
+    """Return the numeric block of an overview, read from its frame on first use."""
+    if "values" not in overview:
+        frame = overview["frame"]
+        overview["values"] = frame[overview["numeric_columns"]].to_numpy(dtype=float, na_value=np.nan)
+    return overview["values"]
+
+
+def percentiles(overview):
+    """Return the percentile table of the numeric columns, computed on first use."""
+    if "percentiles" not in overview:
+        table = None
+        if overview["summary"] is not None:
+            values = np.nanpercentile(_numeric_values(overview), PERCENTILES, axis=0)
+            table = pd.DataFrame(values, index=[f"{p}%" for p in PERCENTILES],
+                                 columns=overview["numeric_columns"])
+        overview["percentiles"] = table
+    return overview["percentiles"]
+
+
+def histogram(overview, column, bins=HISTOGRAM_BINS):
+    """Return the histogram of a numeric column as a Series of counts, computed on first use."""
+    histograms = overview.setdefault("histograms", {})
+    if column not in histograms:
+        values = _numeric_values(overview)[:, overview["numeric_columns"].index(column)]
+        counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+        labels = [f"{left:.4g} to {right:.4g}" for left, right in zip(edges[:-1], edges[1:])]
+        histograms[column] = pd.Series(counts, index=pd.Index(labels, name=column), name="count")
+    return histograms[column]
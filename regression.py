@@ -0,0 +1,201 @@
+"""Regression data synthesizer with a known target function.
+
+A regression model holds the distribution of the features (mean and
+covariance) and the true target function
+
+    target = intercept + f(features @ coefficients) + normal noise
+
+with f one of NONLINEARITIES. It is either fitted on a bundled Regression
+dataset (least squares, noise from the residuals) or built from given
+coefficients. The linear predictor of a fitted model is in target units, so f
+is applied to it standardized instead, and scaled back:
+
+    target = intercept + location + scale * f((features @ coefficients - location) / scale) + noise
+
+where location and scale are the mean and standard deviation of the predictor
+under the feature distribution, kept in the model (for "linear" both forms are
+the same). Rows are generated chunk by chunk with a few matrix operations,
+so the memory use does not depend on the number of rows, and the model can be
+saved as JSON next to the data as its ground truth.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from catalog import DATASETS, cached, dataset_key, dataset_name, load_columns, load_dataset
+from sampling import square_root
+
+# Target column of each bundled Regression dataset
+TARGET_COLUMNS = {name: dataset["label"] for name, dataset in DATASETS.items() if dataset["task"] == "regression"}
+
+# Functions applied to the linear predictor, all NumPy ufuncs so models can be sent to worker processes
+NONLINEARITIES = {
+    "linear": np.positive,
+    "square": np.square,
+    "sine": np.sin,
+    "exp": np.exp,
+}
+
+
+def target_column(source):
+    """Return the target column of a bundled Regression dataset, or None."""
+    return TARGET_COLUMNS.get(dataset_name(source))
+
+
+def numeric_features(df, target):
+    """Return the numeric columns of a DataFrame that can be used as features."""
+    return [column for column in df.columns
+            if column != target and pd.api.types.is_numeric_dtype(df[column])
+            and not pd.api.types.is_bool_dtype(df[column])]
+
+
+def _predictor_scale(coefficients, mean, covariance):
+    """Return the mean (location) and standard deviation (scale) of the linear predictor."""
+    coefficients = np.asarray(coefficients, dtype=float)
+    variance = coefficients @ np.atleast_2d(covariance) @ coefficients
+    return {"location": float(coefficients @ np.asarray(mean)), "scale": float(np.sqrt(variance)) if variance > 0 else 1.0}
+
+
+def fit_regression(df, target):
+    """Fit the feature distribution and a least squares linear model on the complete rows of a DataFrame."""
+    features = numeric_features(df, target)
+    complete = df[features + [target]].dropna()
+    values = complete[features].to_numpy(dtype=float)
+    y = complete[target].to_numpy(dtype=float)
+    if len(complete) <= len(features) + 1:
+        raise ValueError("Not enough complete rows to fit a regression model.")
+
+    design = np.column_stack([np.ones(len(values)), values])
+    solution, _, _, _ = np.linalg.lstsq(design, y, rcond=None)
+    residuals = y - design @ solution
+    noise = np.sqrt(residuals @ residuals / (len(y) - design.shape[1]))
+    return {
+        "target": target,
+        "features": features,
+        "dtypes": [str(df[column].dtype) for column in features],
+        "minimum": values.min(axis=0).tolist(),
+        "maximum": values.max(axis=0).tolist(),
+        "mean": values.mean(axis=0).tolist(),
+        "covariance": np.atleast_2d(np.cov(values, rowvar=False)).tolist(),
+        "intercept": float(solution[0]),
+        "coefficients": solution[1:].tolist(),
+        "noise": float(noise),
+        "nonlinearity": "linear",
+        "standardized": True,
+        **_predictor_scale(solution[1:], values.mean(axis=0), np.cov(values, rowvar=False)),
+    }
+
+
+def get_regression_model(source, fields=None, target=None):
+    """Return the regression model of the selected features of a dataset, fitted once per file version."""
+    target = target or target_column(source)
+    if target is None:
+        raise ValueError(f"No target column is known for '{source}'.")
+    fields = [field for field in fields if field != target] if fields else None
+    key = (dataset_key(source), target, tuple(fields) if fields else None)
+    return cached("regression", key, lambda: fit_regression(
+        load_dataset(source) if fields is None else load_columns(source, fields + [target]), target))
+
+
+def make_regression_model(coefficients, intercept=0.0, noise=1.0, nonlinearity="linear", features=None, target="y"):
+    """Build a model with independent standard normal features and the given target function."""
+    coefficients = [float(value) for value in coefficients]
+    features = list(features) if features else [f"x{i + 1}" for i in range(len(coefficients))]
+    if len(features) != len(coefficients):
+        raise ValueError("Give one coefficient per feature.")
+    return {
+        "target": target,
+        "features": features,
+        "dtypes": ["float64"] * len(features),
+        "mean": [0.0] * len(features),
+        "covariance": np.eye(len(features)).tolist(),
+        "intercept": float(intercept),
+        "coefficients": coefficients,
+        "noise": float(noise),
+        "nonlinearity": nonlinearity,
+        "standardized": False,
+    }
+
+
+def adjust_model(model, coefficients=None, intercept=None, noise=None, nonlinearity=None):
+    """Return a copy of a model with some parts of its target function replaced."""
+    model = dict(model)
+    if coefficients is not None:
+        if len(coefficients) != len(model["features"]):
+            raise ValueError("Give one coefficient per feature.")
+        model["coefficients"] = [float(value) for value in coefficients]
+        if model.get("standardized"):
+            model.update(_predictor_scale(model["coefficients"], model["mean"], model["covariance"]))
+    if intercept is not None:
+        model["intercept"] = float(intercept)
+    if noise is not None:
+        model["noise"] = float(noise)
+    if nonlinearity is not None:
+        model["nonlinearity"] = nonlinearity
+    return model
+
+
+def sample_regression(model, num_rows, seed=None, rng=None):
+    """Generate num_rows features and their target from a regression model."""
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    if model["nonlinearity"] not in NONLINEARITIES:
+        raise ValueError(f"Unknown nonlinearity '{model['nonlinearity']}'.")
+    num_features = len(model["features"])
+
+    # One row per feature, so every column of the output is contiguous
+    values = square_root(np.asarray(model["covariance"])) @ rng.standard_normal((num_features, num_rows))
+    values += np.asarray(model["mean"])[:, None]
+    for i, dtype in enumerate(model["dtypes"]):
+        if np.issubdtype(np.dtype(dtype), np.integer):
+            np.clip(np.rint(values[i]), model["minimum"][i], model["maximum"][i], out=values[i])
+
+    # The target is computed from the features as written, so the ground truth holds exactly
+    linear = np.asarray(model["coefficients"]) @ values
+    function = NONLINEARITIES[model["nonlinearity"]]
+    with np.errstate(over="ignore", invalid="ignore"):
+        if model.get("standardized") and model["nonlinearity"] != "linear":
+            location, scale = model["location"], model["scale"]
+            target = model["intercept"] + location + scale * function((linear - location) / scale)
+        else:
+            target = model["intercept"] + function(linear)
+    target += model["noise"] * rng.standard_normal(num_rows)
+    if not np.isfinite(target).all():
+        raise ValueError(f"The {model['nonlinearity']} target function overflows for these coefficients; "
+                         "choose smaller coefficients or another function.")
+
+    data = {}
+    for i, (column, dtype) in enumerate(zip(model["features"], model["dtypes"])):
+        data[column] = values[i].astype(dtype) if np.issubdtype(np.dtype(dtype), np.integer) else values[i]
+    data[model["target"]] = target
+    return pd.DataFrame(data)
+
+
+def target_function(model):
+    """Describe the target function of a model, as saved with its ground truth."""
+    name = model["nonlinearity"]
+    if name == "linear":
+        return f"{model['target']} = intercept + features @ coefficients + noise"
+    if model.get("standardized"):
+        return (f"{model['target']} = intercept + location + scale * {name}((features @ coefficients - location) / scale)"
+                f" + noise, with location = {model['location']:.6g} and scale = {model['scale']:.6g}")
+    return f"{model['target']} = intercept + {name}(features @ coefficients) + noise"
+
+
+def ground_truth(model):
+    """Return the true coefficients of a model as a DataFrame, intercept first."""
+    return pd.DataFrame({
+        "term": ["(intercept)"] + list(model["features"]),
+        "coefficient": [model["intercept"]] + list(model["coefficients"]),
+    })
+
+
+def save_model(model, path):
+    with open(path, "w") as fileobj:
+        json.dump(model, fileobj, indent=1)
+
+
+def load_model(path):
+    with open(path) as fileobj:
+        return json.load(fileobj)
@@ -0,0 +1,64 @@
+"""Bootstrap sampling engine: draws rows with replacement using NumPy generators."""
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+# Rows generated per chunk by the chunked generators
+CHUNK_ROWS = 1_000_000
+
+
+def chunk_sizes(num_rows, chunk_rows=CHUNK_ROWS):
+    """Split a row count into chunk lengths of at most chunk_rows."""
+    full, rest = divmod(num_rows, chunk_rows)
+    return [chunk_rows] * full + ([rest] if rest else [])
+
+
+def new_seed():
+    """Draw a fresh seed from the OS entropy pool, small enough to be written down and typed back."""
+    return int(np.random.SeedSequence().entropy % 2**32)
+
+
+def chunk_seeds(seed, num_chunks):
+    """Return one independent SeedSequence per chunk, all derived from seed.
+
+    Chunk i always gets the same stream for a given seed, whichever order or
+    process the chunks are generated in.
+    """
+    return np.random.SeedSequence(seed).spawn(num_chunks)
+
+
+def chunk_rngs(seed, num_chunks):
+    """Return one independent random generator per chunk, see chunk_seeds()."""
+    return [np.random.default_rng(child) for child in chunk_seeds(seed, num_chunks)]
+
+
+def square_root(covariance):
+    """Return a matrix A with A @ A.T == covariance, also for singular covariances.
+
+    Multiplying standard normal draws by A gives draws with that covariance.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def take_rows(df, positions, columns=None):
+    """Gather the rows at the given positions, column by column, without copying the frame first."""
+    columns = list(df.columns) if columns is None else list(columns)
+    data = {column: df[column].array.take(positions) for column in columns}
+    return pd.DataFrame(data, index=df.index.take(positions), columns=columns, copy=False)
+
+
+def sample_rows(df, num_rows, columns=None, seed=None, rng=None):
+    """Draw num_rows rows with replacement in a single vectorized batch.
+
+    Equivalent to df[columns].sample(n=num_rows, replace=True), but reproducible
+    through seed (or an explicit numpy Generator passed as rng).
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    if len(df) == 0:
+        raise ValueError("Cannot sample rows from an empty dataset.")
+    with stage("sample", rows=num_rows):
+        positions = rng.integers(0, len(df), size=num_rows)
+        return take_rows(df, positions, columns)
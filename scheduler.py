@@ -0,0 +1,70 @@
+"""Generation scheduler: splits a row count into chunks and generates them on several processes.
+
+Every chunk gets its own SeedSequence-spawned stream (see sampling.chunk_seeds),
+so the output for a given seed and chunk size is the same whatever the number
+of workers. Chunks are always returned in order.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from export import iter_csv_chunks, write_chunks
+from sampling import CHUNK_ROWS, chunk_seeds, chunk_sizes
+
+
+def run_chunk(chunk_fn, args, size, seed_seq, index=0, encode_csv=False):
+    """Generate one chunk with chunk_fn(*args, size, rng).
+
+    With encode_csv the chunk is returned as CSV bytes (with the header only for
+    the first chunk), so the encoding also happens on the worker.
+    """
+    chunk = chunk_fn(*args, size, np.random.default_rng(seed_seq))
+    if encode_csv:
+        return b"".join(iter_csv_chunks(chunk, header=(index == 0)))
+    return chunk
+
+
+def resolve_workers(workers):
+    """Return the number of worker processes, 0 or None meaning one per CPU."""
+    return workers if workers else os.cpu_count() or 1
+
+
+def iter_chunks(chunk_fn, args, num_rows, seed=None, chunk_rows=CHUNK_ROWS, workers=1, encode_csv=False):
+    """Yield the chunks of a generation job in order.
+
+    chunk_fn must be a module-level function (so it can be sent to the worker
+    processes) taking (*args, size, rng). At most two chunks per worker are in
+    flight, which keeps memory bounded for very large row counts.
+    """
+    sizes = chunk_sizes(num_rows, chunk_rows)
+    seeds = chunk_seeds(seed, len(sizes))
+    workers = resolve_workers(workers)
+
+    if workers == 1 or len(sizes) == 1:
+        for index, (size, seed_seq) in enumerate(zip(sizes, seeds)):
+            yield run_chunk(chunk_fn, args, size, seed_seq, index, encode_csv)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for index, (size, seed_seq) in enumerate(zip(sizes, seeds)):
+            pending.append(pool.submit(run_chunk, chunk_fn, args, size, seed_seq, index, encode_csv))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_parallel(chunk_fn, args, num_rows, fileobj, seed=None, chunk_rows=CHUNK_ROWS, workers=1, fmt="csv"):
+    """Generate a job on several processes and write it to fileobj as one file of an export format.
+
+    Plain CSV is encoded on the workers; the other formats are written chunk by
+    chunk as the frames come back.
+    """
+    if fmt != "csv":
+        return write_chunks(iter_chunks(chunk_fn, args, num_rows, seed, chunk_rows, workers), fileobj, fmt)
+    for data in iter_chunks(chunk_fn, args, num_rows, seed, chunk_rows, workers, encode_csv=True):
+        fileobj.write(data)
+    return fileobj
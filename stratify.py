@@ -0,0 +1,169 @@
+"""Stratified sampling for the Classification datasets.
+
+The row positions of every class are collected once per dataset into a class
+index, so samples with exact class proportions (original, balanced or given
+weights) are drawn with one vectorized index draw per class instead of a
+boolean mask per class and request. Classes asked for more rows than they
+have can be topped up with SMOTE-style interpolated rows instead of repeats.
+"""
+import numpy as np
+import pandas as pd
+
+from catalog import DATASETS, cached, dataset_key, dataset_name, load_dataset
+from sampling import CHUNK_ROWS, chunk_rngs, chunk_sizes, take_rows
+
+# Label column of each bundled Classification dataset
+LABEL_COLUMNS = {name: dataset["label"] for name, dataset in DATASETS.items() if dataset["task"] == "classification"}
+
+PROPORTIONS = ["original", "balanced"]
+
+# Neighbours per row that SMOTE-style rows are interpolated towards
+NEIGHBOURS = 5
+
+
+def label_column(source):
+    """Return the label column of a bundled Classification dataset, or None."""
+    return LABEL_COLUMNS.get(dataset_name(source))
+
+
+def build_class_index(df, label):
+    """Group the row positions of a DataFrame by the value of its label column."""
+    codes, classes = pd.factorize(df[label], sort=True)
+    present = np.flatnonzero(codes >= 0)
+    order = present[np.argsort(codes[present], kind="stable")]
+    counts = np.bincount(codes[present], minlength=len(classes))
+    return {
+        "label": label,
+        "classes": list(classes),
+        "counts": counts,
+        "positions": np.split(order, np.cumsum(counts)[:-1]),
+    }
+
+
+def get_class_index(source, label=None):
+    """Return the class index of a dataset, built once per file version."""
+    label = label or label_column(source)
+    if label is None:
+        raise ValueError(f"No label column is known for '{source}'.")
+    return cached("stratify", ("index", dataset_key(source), label), lambda: build_class_index(load_dataset(source), label))
+
+
+def class_weights(index, proportions="original"):
+    """Return the share of each class for 'original', 'balanced' or a {class: weight} mapping."""
+    if proportions == "original":
+        weights = index["counts"].astype(float)
+    elif proportions == "balanced":
+        weights = np.ones(len(index["classes"]))
+    else:
+        # Classes are matched by their text, so weights read back from JSON or typed in still apply
+        proportions = {str(value): weight for value, weight in proportions.items()}
+        unknown = set(proportions) - {str(value) for value in index["classes"]}
+        if unknown:
+            raise ValueError(f"Unknown classes: {', '.join(sorted(unknown))}.")
+        weights = np.array([float(proportions.get(str(value), 0)) for value in index["classes"]])
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Class weights must be non-negative and not all zero.")
+    return weights / weights.sum()
+
+
+def allocate_rows(weights, num_rows):
+    """Split num_rows into exact per-class counts, rounding by largest remainder."""
+    exact = weights * num_rows
+    counts = np.floor(exact).astype(np.int64)
+    remainder = num_rows - counts.sum()
+    counts[np.argsort(counts - exact, kind="stable")[:remainder]] += 1
+    return counts
+
+
+def _neighbours(values, k):
+    """Return the k nearest other rows of every row, as positions into values."""
+    k = min(k, len(values) - 1)
+    if k < 1:
+        return np.arange(len(values))[:, None]
+    squared = (values ** 2).sum(axis=1)
+    distances = squared[:, None] + squared[None, :] - 2 * values @ values.T
+    np.fill_diagonal(distances, np.inf)
+    return np.argpartition(distances, k - 1, axis=1)[:, :k]
+
+
+def _build_neighbours(source, index, fields):
+    df = load_dataset(source)
+    numeric = [column for column in fields
+               if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+    values = df[numeric].to_numpy(dtype=float)
+    scale = np.nanstd(values, axis=0)
+    values = np.nan_to_num((values - np.nanmean(values, axis=0)) / np.where(scale > 0, scale, 1))
+    return {"numeric": numeric,
+            "neighbours": [_neighbours(values[positions], NEIGHBOURS) for positions in index["positions"]]}
+
+
+def get_neighbours(source, index, fields):
+    """Return the within-class nearest neighbours on the numeric selected fields, built once per dataset."""
+    key = ("neighbours", dataset_key(source), index["label"], tuple(fields))
+    return cached("stratify", key, lambda: _build_neighbours(source, index, fields))
+
+
+def _interpolate(df, positions, neighbours, numeric, fields, size, rng):
+    """Generate size rows of one class, each between a random row and one of its neighbours.
+
+    Numeric fields are interpolated (integers rounded back), the other fields
+    are copied from the first row.
+    """
+    base = rng.integers(0, len(positions), size=size)
+    partner = neighbours[base, rng.integers(0, neighbours.shape[1], size=size)]
+    gap = rng.random(size)
+    rows = take_rows(df, positions[base], fields)
+    for column in numeric:
+        values = df[column].to_numpy(dtype=float)
+        start, end = values[positions[base]], values[positions[partner]]
+        interpolated = start + gap * (end - start)
+        if pd.api.types.is_integer_dtype(df[column]):
+            interpolated = np.rint(interpolated).astype(df[column].dtype)
+        rows[column] = interpolated
+    return rows
+
+
+def stratified_sample(source, fields, counts, smote=False, seed=None, rng=None):
+    """Draw counts[i] rows of class i of a dataset, shuffled together.
+
+    Rows are drawn with replacement. With smote, a class gets its rows without
+    repeats up to its size, and the rest are interpolated between neighbours.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    index = get_class_index(source)
+    fields = list(fields)
+    if index["label"] not in fields:
+        fields.append(index["label"])
+    df = load_dataset(source)
+    neighbours = get_neighbours(source, index, fields) if smote else None
+
+    chosen, interpolated = [], []
+    for i, (positions, count) in enumerate(zip(index["positions"], counts)):
+        if not smote:
+            chosen.append(positions[rng.integers(0, len(positions), size=count)])
+            continue
+        real = min(count, len(positions))
+        chosen.append(rng.choice(positions, size=real, replace=False))
+        if count > real:
+            interpolated.append(_interpolate(df, positions, neighbours["neighbours"][i], neighbours["numeric"],
+                                             fields, count - real, rng))
+
+    # Shuffle the classes together, gathering the real rows only once
+    chosen = np.concatenate(chosen) if chosen else np.empty(0, dtype=np.int64)
+    if not interpolated:
+        return take_rows(df, rng.permutation(chosen), fields).reset_index(drop=True)
+    sample = pd.concat([take_rows(df, chosen, fields)] + interpolated, ignore_index=True)
+    return take_rows(sample, rng.permutation(len(sample))).reset_index(drop=True)
+
+
+def iter_stratified_chunks(source, fields, num_rows, proportions="original", smote=False, seed=None,
+                           chunk_rows=CHUNK_ROWS):
+    """Yield a stratified sample in chunks; the class counts over all chunks are exact."""
+    counts = allocate_rows(class_weights(get_class_index(source), proportions), num_rows)
+    sizes = chunk_sizes(num_rows, chunk_rows)
+    rngs = chunk_rngs(seed, len(sizes) + 1)
+    for size, rng in zip(sizes, rngs[1:]):
+        chunk_counts = rngs[0].multivariate_hypergeometric(counts, size)
+        counts = counts - chunk_counts
+        yield stratified_sample(source, fields, chunk_counts, smote, rng=rng)
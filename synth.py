@@ -0,0 +1,137 @@
+"""Statistical synthesizer: fits per-column distributions once and samples new rows from them.
+
+Unlike bootstrap sampling, the generated rows are not copies of source rows:
+numeric columns are drawn from their fitted quantile function and categorical
+columns from their observed frequencies. Optionally a Gaussian copula keeps the
+rank correlation between columns.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from catalog import cached, dataset_key, load_columns
+
+# Numeric columns with at most this many distinct values are modeled as categories
+DISCRETE_LIMIT = 20
+
+# Number of points stored for the quantile function of a numeric column
+QUANTILE_POINTS = 257
+
+
+def _fit_column(series):
+    values = series.dropna()
+    column = {
+        "name": series.name,
+        "dtype": str(series.dtype),
+        "null_fraction": float(1 - len(values) / len(series)) if len(series) else 0.0,
+    }
+    is_numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    if is_numeric and values.nunique() > DISCRETE_LIMIT:
+        points = min(QUANTILE_POINTS, len(values))
+        column["kind"] = "numeric"
+        column["integer"] = bool(pd.api.types.is_integer_dtype(series))
+        column["quantiles"] = np.quantile(values.to_numpy(dtype=float), np.linspace(0, 1, points)).tolist()
+    else:
+        counts = values.value_counts().sort_index()
+        column["kind"] = "categorical"
+        column["values"] = [value.item() if hasattr(value, "item") else value for value in counts.index]
+        column["probabilities"] = (counts.to_numpy() / counts.sum()).tolist() if len(counts) else []
+    return column
+
+
+def _rank_correlation(df):
+    """Spearman correlation of the columns, turned into the matching Gaussian correlation."""
+    ranks = np.column_stack([
+        (pd.Categorical(df[name]).codes if not pd.api.types.is_numeric_dtype(df[name]) else df[name])
+        for name in df.columns
+    ])
+    ranks = pd.DataFrame(ranks).rank().fillna(0).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spearman = np.corrcoef(ranks, rowvar=False)
+    spearman = np.nan_to_num(np.atleast_2d(spearman))
+    np.fill_diagonal(spearman, 1.0)
+    correlation = 2 * np.sin(np.pi * spearman / 6)
+
+    # Clip to the nearest positive definite matrix so it can be factorized
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    correlation = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(correlation))
+    return correlation / np.outer(scale, scale)
+
+
+def fit_model(df, correlated=True):
+    """Fit a synthesis model on a DataFrame and return it as a JSON-serializable dict."""
+    model = {
+        "columns": [_fit_column(df[name]) for name in df.columns],
+        "correlation": None,
+    }
+    if correlated and len(df.columns) > 1 and len(df) > 1:
+        model["correlation"] = _rank_correlation(df).tolist()
+    return model
+
+
+def _normal_cdf(z):
+    # Abramowitz and Stegun 7.1.26 approximation of erf, absolute error below 1.5e-7
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _sample_column(column, uniforms, rng):
+    if column["kind"] == "numeric":
+        # The quantile points are evenly spaced, so interpolation needs no search
+        quantiles = np.asarray(column["quantiles"])
+        position = uniforms * (len(quantiles) - 1)
+        index = np.minimum(position.astype(np.int64), len(quantiles) - 2)
+        lower = quantiles[index]
+        values = lower + (position - index) * (quantiles[index + 1] - lower)
+        if column["integer"]:
+            values = np.rint(values)
+        series = pd.Series(values)
+        if column["integer"] and not column["null_fraction"]:
+            series = series.astype(column["dtype"])
+    else:
+        cumulative = np.cumsum(column["probabilities"])
+        if not len(cumulative):
+            return pd.Series([None] * len(uniforms), dtype=object)
+        codes = np.minimum(np.searchsorted(cumulative, uniforms * cumulative[-1], side="right"), len(cumulative) - 1)
+        series = pd.Series(pd.Categorical.from_codes(codes, categories=column["values"]))
+        if column["dtype"] != "category":
+            series = series.astype(column["dtype"] if not column["null_fraction"] else object)
+
+    if column["null_fraction"]:
+        series = series.mask(rng.random(len(series)) < column["null_fraction"])
+    return series
+
+
+def sample_model(model, num_rows, seed=None, rng=None):
+    """Draw num_rows new rows from a fitted model with vectorized NumPy draws."""
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    columns = model["columns"]
+    if model["correlation"] is not None:
+        normals = rng.multivariate_normal(np.zeros(len(columns)), model["correlation"], size=num_rows, method="cholesky")
+        uniforms = _normal_cdf(np.ascontiguousarray(normals.T))
+    else:
+        uniforms = rng.random((len(columns), num_rows))
+    data = {column["name"]: _sample_column(column, uniforms[i], rng) for i, column in enumerate(columns)}
+    return pd.DataFrame(data, columns=[column["name"] for column in columns])
+
+
+def get_model(source, fields, correlated=True):
+    """Return the model fitted on the selected fields of a dataset, fitting it only once per file version."""
+    key = (dataset_key(source), tuple(fields), correlated)
+    return cached("synth", key, lambda: fit_model(load_columns(source, fields), correlated))
+
+
+def save_model(model, path):
+    with open(path, "w") as fileobj:
+        json.dump(model, fileobj)
+
+
+def load_model(path):
+    with open(path) as fileobj:
+        return json.load(fileobj)
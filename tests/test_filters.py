@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import filters
+from catalog import DATASET_PATHS, clear_cache, load_dataset, resolve_path
+
+
+@pytest.mark.parametrize("name, expression", [
+    ("heart_disease", "age * 3 > 150"),
+    ("heart_disease", "chol + trestbps > 400 and sex == 1"),
+    ("diabetes", "Outcome == 1"),
+    ("diabetes", "Glucose * Insulin > 20000"),
+    ("house_price", "ocean_proximity == 'NEAR BAY' and median_income > 5"),
+    ("house_price", "population / households > 3"),
+])
+def test_mask_matches_uncompacted_frame(name, expression):
+    # The catalog downcasts integers (age is int8), the raw CSV keeps them as int64
+    raw = pd.read_csv(resolve_path(DATASET_PATHS[name]))
+    expected = raw.eval(expression).to_numpy(dtype=bool)
+    clear_cache()
+    mask = filters.dataset_mask(DATASET_PATHS[name], expression)
+    assert mask.sum() == expected.sum()
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_widen_keeps_values():
+    df = pd.DataFrame({"small": np.array([100, -100], dtype=np.int8), "single": np.array([1.5, 2.5], dtype=np.float32)})
+    widened = filters._widen(df)
+    assert widened["small"].dtype == np.int64 and widened["single"].dtype == np.float64
+    assert list(widened["small"] * 3) == [300, -300]
+
+
+def test_catalog_is_compacted():
+    assert load_dataset(DATASET_PATHS["heart_disease"])["age"].dtype == np.int8
+
+
+FRAME = pd.DataFrame({"age": [30, 60, 45], "sex": [0, 1, 1], "kind": ["a", "b", "c"], "blood pressure": [120, 140, 130]})
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("age > 40", [False, True, True]),
+    ("age > 40 and not sex == 0", [False, True, True]),
+    ("(age * 2 - 10 >= 100) | (sex != 1)", [True, True, False]),
+    ("~(age < 50) & (sex == 1)", [False, True, False]),
+    ("kind in ['a', 'c']", [True, False, True]),
+    ("kind not in ('a',)", [False, True, True]),
+    ("`blood pressure` % 20 == 0 or age ** 2 < -1", [True, True, False]),
+    ("kind == 'x.y @z __class__'", [False, False, False]),
+    ("(age > 30.5) == True", [False, True, True]),
+])
+def test_accepted_expressions(expression, expected):
+    np.testing.assert_array_equal(filters.evaluate(FRAME, expression), expected)
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("age > @limit", "local variables"),
+    ("age.__class__ == 1", "Attribute"),
+    ("kind.str.len() > 1", "is not allowed"),
+    ("__import__('os').system('true') == 0", "__"),
+    ("age > abs(-1)", "Call"),
+    ("kind[0] == 'a'", "Subscript"),
+    ("(lambda: 1)() == 1", "is not allowed"),
+    ("[x for x in kind] == 1", "ListComp"),
+    ("height > 1", "unknown column 'height'"),
+    ("age = 1", "not a valid expression"),
+    ("age > None", "literal"),
+    ("age == 9**9**9", "needs a column"),
+    ("age * 9**9**9 > 1", "needs a column"),
+    ("-(9**9)**9 < age", "needs a column"),
+    ("kind == 'a' * 10**9", "needs a column"),
+    ("age > 2 * 3", "needs a column"),
+])
+def test_rejected_expressions(expression, message):
+    with pytest.raises(ValueError, match=message):
+        filters.evaluate(FRAME, expression)
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from catalog import DATASETS, resolve_path
+from export import EXPORT_FORMATS, export_buffer
+from manifest import dumps_manifest, generate_dataset, make_manifest, replay_to_file
+from regression import make_regression_model
+
+IRIS_PATH = resolve_path(DATASETS["iris"]["path"])
+
+# Small parameters of every replayable generator, as the app passes them
+PARAMS = {
+    "sample": {"source": "house_price", "fields": ["median_income", "ocean_proximity"], "num_rows": 300,
+               "where": "median_income > 3"},
+    "synthesize": {"source": "iris", "fields": ["sepal_length", "petal_width", "species"], "num_rows": 300},
+    "regression": {"model": make_regression_model([2.0, -1.0], intercept=1.0, noise=0.1), "num_rows": 300},
+    "stratified": {"source": "iris", "fields": ["sepal_length", "species"], "num_rows": 300,
+                   "proportions": "balanced", "smote": True},
+    "clusters": {"source": "clustered_1", "fields": ["age", "chol"], "num_rows": 300, "num_clusters": 4,
+                 "separation": 1.5},
+    "baskets": {"source": "bakery", "num_rows": 100, "synthetic": True},
+    "timeseries": {"source": "groceries", "num_days": 10, "start": "2024-01-01", "scale": 1.0},
+    "spec": {"spec": [{"name": "id", "rule": "sequence", "start": 1, "step": 1},
+                      {"name": "code", "rule": "pattern", "pattern": "[A-Z]{3}-\\d{4}"}], "num_rows": 300},
+    "values": {"values": {"a": ["1", "2", ""], "b": ["x", None, "z"]}},
+    "trim": {"source": IRIS_PATH, "fields": ["sepal_length", "species"], "num_rows": 50},
+}
+
+
+def _replayed(generator, params, seed, fmt):
+    # The manifest goes through JSON, as when it is downloaded and replayed on the command line
+    manifest = json.loads(dumps_manifest(make_manifest(generator, params, seed)))
+    return replay_to_file(manifest, io.BytesIO(), fmt).getvalue()
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+@pytest.mark.parametrize("generator", list(PARAMS))
+def test_replay_gives_the_bytes_of_the_app_download(generator, fmt):
+    data = generate_dataset(generator, PARAMS[generator], 7)
+    assert _replayed(generator, PARAMS[generator], 7, fmt) == export_buffer(data, fmt).read()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_replay_keeps_the_export_blocks_of_large_downloads(fmt):
+    # More rows than one export block, so the download has several row groups / record batches
+    params = {"source": "iris", "fields": ["sepal_length", "species"], "num_rows": 120_000}
+    data = generate_dataset("sample", params, 3)
+    assert _replayed("sample", params, 3, fmt) == export_buffer(data, fmt).read()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_replay_of_chunked_output(fmt):
+    params = {"source": "iris", "fields": ["sepal_length", "species"], "num_rows": 2_000, "chunk_rows": 300}
+    manifest = make_manifest("sample", params, 5)
+    assert replay_to_file(manifest, io.BytesIO(), fmt).getvalue() == replay_to_file(manifest, io.BytesIO(), fmt).getvalue()
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_replay_into_a_named_file(tmp_path, fmt):
+    # Writers must not store the file name (gzip does by default), or the replay differs from the download
+    params = PARAMS["sample"]
+    data = generate_dataset("sample", params, 9)
+    manifest = json.loads(dumps_manifest(make_manifest("sample", params, 9)))
+    path = tmp_path / f"replayed{EXPORT_FORMATS[fmt]['extension']}"
+    with open(path, "wb") as fileobj:
+        replay_to_file(manifest, fileobj, fmt)
+    assert path.read_bytes() == export_buffer(data, fmt).read()
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from regression import NONLINEARITIES, adjust_model, get_regression_model, make_regression_model, sample_regression
+
+
+@pytest.mark.parametrize("source", ["car_price", "electricity", "house_price"])
+@pytest.mark.parametrize("nonlinearity", list(NONLINEARITIES))
+def test_fitted_models_give_finite_targets(source, nonlinearity):
+    model = adjust_model(get_regression_model(source), nonlinearity=nonlinearity)
+    target = sample_regression(model, 1000, seed=1)[model["target"]]
+    assert np.isfinite(target).all()
+
+
+def test_linear_target_is_unchanged_by_standardizing():
+    model = get_regression_model("house_price")
+    data = sample_regression(model, 100, seed=2)
+    raw = dict(model, standardized=False)
+    np.testing.assert_allclose(data[model["target"]], sample_regression(raw, 100, seed=2)[model["target"]])
+
+
+def test_overflowing_target_is_an_error():
+    model = make_regression_model([500.0], nonlinearity="exp")
+    with pytest.raises(ValueError, match="overflows"):
+        sample_regression(model, 100, seed=1)
@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+import pytest
+
+from generators import regression_chunk, sample_chunk
+from regression import make_regression_model
+from scheduler import iter_chunks, write_parallel
+
+REGRESSION_MODEL = make_regression_model([2.0, -1.0, 0.5], intercept=1.0, noise=0.1)
+
+
+def _write(chunk_fn, args, fmt, workers):
+    return write_parallel(chunk_fn, args, 2_500, io.BytesIO(), seed=11, chunk_rows=400, workers=workers, fmt=fmt).getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+@pytest.mark.parametrize("chunk_fn, args", [
+    (regression_chunk, (REGRESSION_MODEL,)),
+    (sample_chunk, ("iris", ["sepal_length", "species"], None)),
+])
+def test_output_does_not_depend_on_workers(chunk_fn, args, fmt):
+    serial = _write(chunk_fn, args, fmt, workers=1)
+    assert serial
+    assert _write(chunk_fn, args, fmt, workers=2) == serial
+
+
+def test_chunks_are_returned_in_order():
+    serial = pd.concat(iter_chunks(regression_chunk, (REGRESSION_MODEL,), 2_500, seed=3, chunk_rows=400, workers=1))
+    parallel = pd.concat(iter_chunks(regression_chunk, (REGRESSION_MODEL,), 2_500, seed=3, chunk_rows=400, workers=2))
+    assert len(serial) == 2_500
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from trimmer import reservoir_sample, trim_file
+
+
+def _csv(num_rows):
+    return io.StringIO(pd.DataFrame({"row": np.arange(num_rows), "other": np.arange(num_rows) * 2}).to_csv(index=False))
+
+
+def test_sample_size():
+    sample = trim_file(_csv(1000), ["row"], 50, seed=1, chunk_rows=64)
+    assert list(sample.columns) == ["row"]
+    assert len(sample) == 50
+    assert sample["row"].is_unique
+
+
+def test_short_file_is_returned_whole():
+    sample = trim_file(_csv(20), ["row"], 50, seed=1, chunk_rows=8)
+    assert sorted(sample["row"]) == list(range(20))
+
+
+def test_seed_reproduces_sample():
+    first = trim_file(_csv(1000), ["row", "other"], 50, seed=7, chunk_rows=64)
+    second = trim_file(_csv(1000), ["row", "other"], 50, seed=7, chunk_rows=64)
+    other = trim_file(_csv(1000), ["row", "other"], 50, seed=8, chunk_rows=64)
+    pd.testing.assert_frame_equal(first, second)
+    assert not first.equals(other)
+
+
+def test_sample_is_uniform():
+    # Every row is kept with probability 50 / 1000, so each tenth of the file gets about 10% of the picks
+    frame = pd.DataFrame({"row": np.arange(1000)})
+    rng = np.random.default_rng(0)
+    counts = np.zeros(10)
+    trials = 400
+    for _ in range(trials):
+        chunks = (frame.iloc[start:start + 64] for start in range(0, 1000, 64))
+        sample, seen = reservoir_sample(chunks, 50, rng=rng)
+        assert seen == 1000
+        counts += np.bincount(sample["row"].to_numpy() // 100, minlength=10)
+    expected = trials * 50 / 10
+    assert np.all(np.abs(counts - expected) < 0.1 * expected)
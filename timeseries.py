@@ -0,0 +1,188 @@
+"""Time-series generation for the Association datasets with timestamps (bakery and groceries).
+
+The timestamps of a dataset are parsed once into datetime64, one per
+transaction, and cached per file version. A model then learns for every day
+type (weekday / weekend) and daypart the mean number of transactions per open
+day and the distribution of their minute of the day. New event streams draw a
+Poisson number of transactions for each day and daypart, their times from that
+distribution and their baskets from the transactions seen in the same day type
+and daypart, a chunk of days at a time.
+"""
+import numpy as np
+import pandas as pd
+
+from baskets import BASKET_LAYOUTS, basket_sizes, load_baskets, take_transactions
+from catalog import cached, dataset_key, load_dataset
+from sampling import chunk_rngs, chunk_sizes
+
+# Timestamp column of each dataset and its format, plus the columns describing a transaction:
+# a transaction number that is renumbered, columns kept from the sampled transaction, daypart and day type
+TIME_LAYOUTS = {
+    "bakery": {"time": "DateTime", "format": "%Y-%m-%d %H:%M:%S", "number": "TransactionNo",
+               "daypart": "Daypart", "day_type": "DayType"},
+    "groceries": {"time": "Date", "format": "%d-%m-%Y", "keep": ["Member_number"]},
+}
+
+# Day type of each day of the week (Monday first) for the datasets without a day type column
+WEEKDAY_TYPES = ["Weekday"] * 5 + ["Weekend"] * 2
+
+# Single daypart of the datasets without a daypart column
+WHOLE_DAY = "Day"
+
+# Days generated per chunk by iter_time_series_chunks()
+CHUNK_DAYS = 7
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _weekdays(days):
+    """Return the day of the week (Monday = 0) of datetime64 days; 1970-01-01 was a Thursday."""
+    return (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+
+def _build_events(source):
+    """Parse the timestamps of a dataset into one row per transaction, in the order of load_baskets()."""
+    layout = TIME_LAYOUTS[source]
+    dataset = load_dataset(source)
+    codes = dataset.groupby(BASKET_LAYOUTS[source]["transaction"], sort=False, observed=True).ngroup().to_numpy()
+    _, first = np.unique(codes[codes >= 0], return_index=True)
+    rows = dataset.iloc[np.flatnonzero(codes >= 0)[first]]
+    events = {
+        "columns": list(dataset.columns),
+        "time": pd.to_datetime(rows[layout["time"]], format=layout["format"]).to_numpy().astype("datetime64[s]"),
+    }
+    for key in ("daypart", "day_type"):
+        if key in layout:
+            events[key] = rows[layout[key]].astype(str).to_numpy()
+    for column in layout.get("keep", []):
+        events[column] = rows[column].to_numpy()
+    return events
+
+
+def load_events(source):
+    """Return the transactions of a dataset with their parsed timestamps, built once per file version."""
+    return cached("timeseries", ("events", dataset_key(source)), lambda: _build_events(source))
+
+
+def load_time_model(source):
+    """Return the arrival model of a dataset, fitted once per file version."""
+    return cached("timeseries", ("model", dataset_key(source)), lambda: fit_time_model(load_events(source)))
+
+
+def fit_time_model(events):
+    """Learn arrival rates and minute-of-day distributions per day type and daypart from transaction times."""
+    times = events["time"]
+    days = times.astype("datetime64[D]")
+    weekdays = _weekdays(days)
+
+    if "day_type" in events:
+        # Each day of the week gets the day type most of its transactions have
+        table = pd.crosstab(weekdays, events["day_type"])
+        day_types = list(table.columns)
+        weekday_types = np.array([day_types.index(table.loc[weekday].idxmax()) if weekday in table.index
+                                  else day_types.index(WEEKDAY_TYPES[weekday]) if WEEKDAY_TYPES[weekday] in day_types
+                                  else 0 for weekday in range(7)])
+    else:
+        day_types = sorted(set(WEEKDAY_TYPES))
+        weekday_types = np.array([day_types.index(day_type) for day_type in WEEKDAY_TYPES])
+    if "daypart" in events:
+        part_codes, dayparts = pd.factorize(events["daypart"])
+        dayparts = list(dayparts)
+    else:
+        part_codes, dayparts = np.zeros(len(times), dtype=np.int64), [WHOLE_DAY]
+
+    # Rates are per open day, i.e. per day with at least one transaction, of each day type
+    num_parts = len(dayparts)
+    groups = weekday_types[weekdays] * num_parts + part_codes
+    open_days = np.bincount(weekday_types[_weekdays(np.unique(days))], minlength=len(day_types))
+    counts = np.bincount(groups, minlength=len(day_types) * num_parts).reshape(len(day_types), num_parts)
+    minutes = ((times - days) // np.timedelta64(60, "s")).astype(np.int64)
+    histogram = np.zeros((len(day_types) * num_parts, MINUTES_PER_DAY))
+    np.add.at(histogram, (groups, minutes), 1)
+    order = np.argsort(groups, kind="stable")
+
+    return {
+        "day_types": day_types,
+        "dayparts": dayparts,
+        "weekday_types": weekday_types,
+        "rates": counts / np.maximum(open_days, 1)[:, None],
+        "minutes": histogram / np.maximum(histogram.sum(axis=1, keepdims=True), 1),
+        "transactions": order,
+        "starts": np.searchsorted(groups[order], np.arange(len(day_types) * num_parts + 1)),
+        "daily": not minutes.any(),
+        "last_day": days.max(),
+    }
+
+
+def arrival_rates(model):
+    """Return the mean transactions per open day of a model, one row per day type and one column per daypart."""
+    return pd.DataFrame(model["rates"], index=model["day_types"], columns=model["dayparts"])
+
+
+def generate_events(source, model, events, baskets, first_day, num_days, scale=1.0, first_transaction=1, rng=None):
+    """Generate the transactions of num_days days from first_day, in time order, in the layout of the dataset."""
+    layout = TIME_LAYOUTS[source]
+    num_parts = len(model["dayparts"])
+    days = first_day + np.arange(num_days)
+    types = model["weekday_types"][_weekdays(days)]
+
+    # Poisson number of transactions per day and daypart, then a time and a basket for each of them
+    counts = rng.poisson(model["rates"][types] * scale)
+    cells = np.repeat(np.arange(counts.size), counts.ravel())
+    day_index, parts = np.divmod(cells, num_parts)
+    groups = types[day_index] * num_parts + parts
+    minutes = np.empty(len(cells), dtype=np.int64)
+    positions = np.empty(len(cells), dtype=np.int64)
+    for group in np.unique(groups):
+        chosen = np.flatnonzero(groups == group)
+        minutes[chosen] = rng.choice(MINUTES_PER_DAY, size=len(chosen), p=model["minutes"][group])
+        pool = model["transactions"][model["starts"][group]:model["starts"][group + 1]]
+        positions[chosen] = pool[rng.integers(0, len(pool), size=len(chosen))]
+    seconds = minutes * 60
+    if not model["daily"]:
+        seconds += rng.integers(0, 60, size=len(cells))
+    times = days[day_index].astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+    order = np.argsort(times, kind="stable")
+    times, parts, day_index, positions = times[order], parts[order], day_index[order], positions[order]
+
+    # One row per item, as in the dataset
+    generated = take_transactions(baskets, positions)
+    owner = np.repeat(np.arange(len(positions)), basket_sizes(generated))
+    item_column = BASKET_LAYOUTS[source]["item"]
+    data = {
+        item_column: pd.Categorical.from_codes(generated["indices"], categories=baskets["items"]),
+        layout["time"]: times[owner],
+    }
+    if "number" in layout:
+        data[layout["number"]] = first_transaction + owner
+    if "daypart" in layout:
+        data[layout["daypart"]] = pd.Categorical.from_codes(parts[owner], categories=model["dayparts"])
+    if "day_type" in layout:
+        data[layout["day_type"]] = pd.Categorical.from_codes(types[day_index][owner], categories=model["day_types"])
+    for column in layout.get("keep", []):
+        data[column] = events[column][positions][owner]
+    return pd.DataFrame(data, columns=[column for column in events["columns"] if column in data])
+
+
+def iter_time_series_chunks(source, num_days, start=None, scale=1.0, seed=None, chunk_days=CHUNK_DAYS):
+    """Yield a synthetic event stream of num_days days of a dataset as DataFrame chunks of chunk_days days.
+
+    start is the first day (a date or "YYYY-MM-DD"), by default the day after
+    the dataset ends; scale multiplies the arrival rates.
+    """
+    if num_days < 1:
+        raise ValueError("Generate at least one day.")
+    if scale <= 0:
+        raise ValueError("The rate scale must be positive.")
+    events = load_events(source)
+    model = load_time_model(source)
+    baskets = load_baskets(source)
+    first_day = np.datetime64(start, "D") if start else model["last_day"] + 1
+    sizes = chunk_sizes(num_days, chunk_days)
+    first_transaction = 1
+    for size, rng in zip(sizes, chunk_rngs(seed, len(sizes))):
+        chunk = generate_events(source, model, events, baskets, first_day, size, scale, first_transaction, rng)
+        yield chunk
+        first_day += size
+        if "number" in TIME_LAYOUTS[source] and len(chunk):
+            first_transaction = int(chunk[TIME_LAYOUTS[source]["number"]].iloc[-1]) + 1
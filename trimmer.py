@@ -0,0 +1,92 @@
+"""Out-of-core dataset trimming: reads CSV files in chunks and keeps a uniform row sample."""
+import numpy as np
+import pandas as pd
+
+from filters import filter_chunks, filter_columns
+
+# Rows parsed per chunk while streaming a file
+CHUNK_ROWS = 100_000
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def peek_columns(source):
+    """Read only the header of a CSV file and return its column names."""
+    _rewind(source)
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    _rewind(source)
+    return columns
+
+
+def iter_chunks(source, columns=None, chunk_rows=CHUNK_ROWS):
+    """Yield a CSV file as DataFrame chunks, parsing only the given columns."""
+    _rewind(source)
+    with pd.read_csv(source, usecols=columns, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield chunk if columns is None else chunk[list(columns)]
+
+
+def reservoir_sample(chunks, num_rows, seed=None, rng=None):
+    """Uniformly sample num_rows rows without replacement from a stream of chunks.
+
+    Uses reservoir sampling (Algorithm R) vectorized per chunk, so only the
+    reservoir and the current chunk are ever held in memory. Returns the sample
+    and the total number of rows seen; if the stream is shorter than num_rows
+    every row is returned.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    reservoir = None
+    seen = 0
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+
+        # Fill the reservoir with the first num_rows rows
+        if reservoir is None or len(reservoir) < num_rows:
+            missing = num_rows - (0 if reservoir is None else len(reservoir))
+            head = chunk.iloc[:missing]
+            reservoir = head if reservoir is None else pd.concat([reservoir, head], ignore_index=True)
+            seen += len(head)
+            chunk = chunk.iloc[missing:].reset_index(drop=True)
+            if chunk.empty:
+                continue
+
+        # Row number t (1-based) replaces a random slot with probability num_rows / t
+        totals = np.arange(seen + 1, seen + len(chunk) + 1)
+        slots = rng.integers(0, totals)
+        seen += len(chunk)
+        rows = np.flatnonzero(slots < num_rows)
+        if not len(rows):
+            continue
+
+        # When several rows hit the same slot the last one wins, as in the sequential algorithm
+        last_first = rows[::-1]
+        _, unique_positions = np.unique(slots[last_first], return_index=True)
+        rows = last_first[unique_positions]
+        sources = np.arange(len(reservoir))
+        sources[slots[rows]] = len(reservoir) + np.arange(len(rows))
+        combined = pd.concat([reservoir, chunk.iloc[rows]], ignore_index=True)
+        reservoir = combined.take(sources).reset_index(drop=True)
+
+    return reservoir, seen
+
+
+def trim_file(source, fields, num_rows, seed=None, chunk_rows=CHUNK_ROWS, where=None):
+    """Keep the selected fields and a uniform sample of num_rows rows of a CSV file.
+
+    source can be a path or a file object (e.g. a Streamlit upload). where is an
+    optional filter expression (see filters.py): only the matching rows are
+    sampled, and only the selected fields and the columns it names are parsed.
+    """
+    if where:
+        columns = list(fields) + [column for column in filter_columns(where, peek_columns(source)) if column not in fields]
+        chunks = filter_chunks(iter_chunks(source, columns, chunk_rows), where, fields)
+    else:
+        chunks = iter_chunks(source, fields, chunk_rows)
+    reservoir, _ = reservoir_sample(chunks, num_rows, seed=seed)
+    if reservoir is None:
+        reservoir = pd.DataFrame(columns=list(fields))
+    return reservoir